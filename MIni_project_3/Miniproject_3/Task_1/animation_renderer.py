@@ -0,0 +1,187 @@
+import argparse
+import os
+import queue
+import threading
+import time
+import numpy as np
+from render_engines import ENGINES, get_engine
+from render_pipeline import PALETTE_ANCHORS, colourize, write_png
+
+OUTPUT_FORMATS = ("png", "raw")
+
+_DONE = object()
+
+def interpolate_path(keyframes, frames_per_segment):
+
+    """
+        Expand a keyframe path into one view per frame.
+
+        Centres are interpolated linearly, scales geometrically (so a zoom runs at a constant
+        rate) and the iteration budget linearly.
+
+        Parameters:
+            keyframes (list): A list of (centre, scale, max_iterations) tuples, where 'centre' is a
+                complex number and 'scale' is half the width of the view on the real axis.
+            frames_per_segment (int): The number of frames between two consecutive keyframes.
+
+        Returns:
+            list: A list of (centre, scale, max_iterations) tuples, one per frame, ending on the last keyframe.
+    """
+
+    if len(keyframes) < 2:
+        return [(complex(c), float(s), int(n)) for c, s, n in keyframes]
+
+    frames = []
+    for (c0, s0, n0), (c1, s1, n1) in zip(keyframes[:-1], keyframes[1:]):
+        for k in range(frames_per_segment):
+            t = k / frames_per_segment
+            centre = complex(c0) + (complex(c1) - complex(c0)) * t
+            scale = s0 * (s1 / s0) ** t
+            frames.append((centre, scale, int(round(n0 + (n1 - n0) * t))))
+    c, s, n = keyframes[-1]
+    frames.append((complex(c), float(s), int(n)))
+    return frames
+
+def frame_viewport(centre, scale, width, height):
+
+    """
+        Return (xmin, xmax, ymin, ymax) for a view of half-width 'scale' around 'centre',
+        keeping the pixels square.
+    """
+
+    half_height = scale * height / width
+    return centre.real - scale, centre.real + scale, centre.imag - half_height, centre.imag + half_height
+
+def _write_frame(output_dir, index, rgb, output_format):
+    if output_format == "png":
+        write_png(os.path.join(output_dir, f"frame_{index:05d}.png"), rgb)
+    else:
+        with open(os.path.join(output_dir, f"frame_{index:05d}.rgb"), "wb") as f:
+            f.write(np.ascontiguousarray(rgb[::-1]).tobytes())
+
+def render_animation(keyframes, frames_per_segment, output_dir, width, height, engine="numba", palette="hot",
+                     output_format="png", queue_size=4, writers=2):
+
+    """
+        Render a keyframe path to numbered frames with compute overlapped with colouring and writing.
+
+        One producer thread computes the escape counts of each frame with a single warm engine
+        while 'writers' consumer threads colour and write finished frames. The queue between them
+        holds at most 'queue_size' frames, which bounds memory use when writing is slower than computing.
+
+        Parameters:
+            keyframes (list): A list of (centre, scale, max_iterations) tuples, see interpolate_path.
+            frames_per_segment (int): The number of frames between two consecutive keyframes.
+            output_dir (str): The directory for the frames, created if needed.
+            width (int): The width of each frame (number of pixels).
+            height (int): The height of each frame (number of pixels).
+            engine (str): The engine to compute with, see render_engines.ENGINES.
+            palette (str): The name of the palette, see render_pipeline.PALETTE_ANCHORS.
+            output_format (str): "png" for frame_NNNNN.png files, "raw" for frame_NNNNN.rgb files
+                holding width * height * 3 bytes of top-to-bottom RGB.
+            queue_size (int): The maximum number of computed frames waiting to be written.
+            writers (int): The number of colouring/writing threads.
+
+        Returns:
+            dict: 'frames', 'seconds' and 'fps' for the whole batch, plus 'compute_seconds' and
+                'write_seconds', the busy time of the producer and of all writers together.
+    """
+
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    frames = interpolate_path(keyframes, frames_per_segment)
+    renderer = get_engine(engine)
+
+    computed = queue.Queue(maxsize=queue_size)
+    errors = []
+    busy = {"compute": 0.0, "write": 0.0}
+    busy_lock = threading.Lock()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for index, (centre, scale, max_iterations) in enumerate(frames):
+                if stop.is_set():
+                    break
+                start_time = time.perf_counter()
+                xmin, xmax, ymin, ymax = frame_viewport(centre, scale, width, height)
+                counts, modulus_sq = renderer.compute(width, height, xmin, xmax, ymin, ymax, max_iterations)
+                busy["compute"] += time.perf_counter() - start_time
+                computed.put((index, counts, modulus_sq, max_iterations))
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            for _ in range(writers):
+                computed.put(_DONE)
+
+    def consume():
+        while True:
+            item = computed.get()
+            if item is _DONE:
+                return
+            if stop.is_set():
+                continue
+            try:
+                start_time = time.perf_counter()
+                index, counts, modulus_sq, max_iterations = item
+                rgb = colourize(counts, modulus_sq, max_iterations, palette)
+                _write_frame(output_dir, index, rgb, output_format)
+                with busy_lock:
+                    busy["write"] += time.perf_counter() - start_time
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+    start_time = time.perf_counter()
+    threads = [threading.Thread(target=produce)] + [threading.Thread(target=consume) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start_time
+
+    if errors:
+        raise errors[0]
+
+    return {
+        "frames": len(frames),
+        "seconds": seconds,
+        "fps": len(frames) / seconds if seconds > 0 else float("inf"),
+        "compute_seconds": busy["compute"],
+        "write_seconds": busy["write"],
+    }
+
+def main(argv=None):
+
+    """
+        Command line entry point: render a zoom from the full view towards a point on the boundary.
+    """
+
+    parser = argparse.ArgumentParser(description="Render a Mandelbrot zoom to numbered frames.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames", type=int, default=60, help="frames between the two keyframes")
+    parser.add_argument("--centre-real", type=float, default=-0.743643887037151)
+    parser.add_argument("--centre-imag", type=float, default=0.131825904205330)
+    parser.add_argument("--zoom", type=float, default=1e4, help="ratio of the first to the last scale")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="numba")
+    parser.add_argument("--palette", choices=sorted(PALETTE_ANCHORS), default="hot")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="png")
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    centre = complex(args.centre_real, args.centre_imag)
+    keyframes = [(complex(-0.5, 0.0), 1.5, 100), (centre, 1.5 / args.zoom, 1000)]
+    stats = render_animation(keyframes, args.frames, args.output_dir, args.width, args.height, engine=args.engine,
+                             palette=args.palette, output_format=args.format, queue_size=args.queue_size,
+                             writers=args.writers)
+    print(f"Rendered {stats['frames']} frames in {stats['seconds']:.2f} seconds ({stats['fps']:.2f} frames per second)")
+    print(f"Compute busy: {stats['compute_seconds']:.2f} seconds, colour/write busy: {stats['write_seconds']:.2f} seconds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+import numpy as np
+import pytest
+from animation_renderer import interpolate_path, frame_viewport, render_animation
+from render_engines import get_engine
+from render_pipeline import colourize
+
+KEYFRAMES = [(complex(-0.5, 0.0), 1.5, 50), (complex(-0.75, 0.1), 0.015, 150)]
+
+def test_interpolate_path_endpoints():
+    frames = interpolate_path(KEYFRAMES, 4)
+    assert len(frames) == 5
+    assert frames[0] == (complex(-0.5, 0.0), 1.5, 50)
+    assert frames[-1] == (complex(-0.75, 0.1), 0.015, 150)
+    # A geometric zoom shrinks the scale by the same ratio every frame
+    ratios = [b[1] / a[1] for a, b in zip(frames[:-1], frames[1:])]
+    np.testing.assert_allclose(ratios, ratios[0])
+
+def test_render_animation_png(tmp_path):
+    stats = render_animation(KEYFRAMES, 3, str(tmp_path), 32, 24, engine="numpy", queue_size=1, writers=2)
+    assert stats["frames"] == 4
+    assert sorted(os.listdir(tmp_path)) == [f"frame_{i:05d}.png" for i in range(4)]
+
+def test_render_animation_raw_matches_single_frame(tmp_path):
+    width, height = 20, 10
+    render_animation(KEYFRAMES, 2, str(tmp_path), width, height, engine="numpy", output_format="raw")
+    raw = np.fromfile(tmp_path / "frame_00002.rgb", dtype=np.uint8).reshape(height, width, 3)
+
+    centre, scale, max_iterations = KEYFRAMES[-1]
+    counts, modulus_sq = get_engine("numpy").compute(width, height, *frame_viewport(centre, scale, width, height), max_iterations)
+    np.testing.assert_array_equal(raw, colourize(counts, modulus_sq, max_iterations)[::-1])
+
+def test_render_animation_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        render_animation(KEYFRAMES, 2, str(tmp_path), 8, 8, engine="numpy", output_format="gif")
+
+if __name__ == "__main__":
+    pytest.main()
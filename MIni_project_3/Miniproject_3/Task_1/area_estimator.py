@@ -0,0 +1,253 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool, cpu_count
+from statistics import NormalDist
+import numpy as np
+from numba import njit
+from numba_approach import mandelbrot
+
+METHODS = ("halton", "stratified", "random")
+
+# Area of the Mandelbrot set, from the literature
+REFERENCE_AREA = 1.50659177
+
+@njit(nogil=True)
+def radical_inverse(index, base):
+
+    """
+        Return the van der Corput radical inverse of 'index' in 'base', a point of [0, 1).
+    """
+
+    result = 0.0
+    scale = 1.0 / base
+    while index > 0:
+        result += (index % base) * scale
+        index //= base
+        scale /= base
+    return result
+
+@njit(nogil=True)
+def count_inside(method, start, stop, seed, shift_x, shift_y, strata, xmin, width, ymin, height, max_iterations):
+
+    """
+        Count the samples start .. stop - 1 of one replica that do not escape, without storing them.
+
+        Parameters:
+            method (int): The index in METHODS of the way points are drawn. Halton points are
+                computed from their index and moved by ('shift_x', 'shift_y') modulo 1. Stratified
+                sample 'i' lies in cell i % strata^2 of a strata x strata grid, at a random position.
+            start (int): The index of the first sample.
+            stop (int): One past the index of the last sample.
+            seed (int): The seed of the random numbers of the stratified and random methods.
+            shift_x (float): The random shift of the Halton points along the real axis.
+            shift_y (float): The random shift of the Halton points along the imaginary axis.
+            strata (int): The number of strata along each axis.
+            xmin (float): The real coordinate of the left edge of the region.
+            width (float): The width of the region.
+            ymin (float): The imaginary coordinate of the bottom edge of the region.
+            height (float): The height of the region.
+            max_iterations (int): Samples that have not escaped after this many iterations count as inside.
+
+        Returns:
+            int: The number of samples inside the set.
+    """
+
+    if method != 0:
+        np.random.seed(seed)
+    inside = 0
+    cells = strata * strata
+    for i in range(start, stop):
+        if method == 0:
+            u = (radical_inverse(i + 1, 2) + shift_x) % 1.0
+            v = (radical_inverse(i + 1, 3) + shift_y) % 1.0
+        elif method == 1:
+            cell = i % cells
+            u = (cell % strata + np.random.random()) / strata
+            v = (cell // strata + np.random.random()) / strata
+        else:
+            u = np.random.random()
+            v = np.random.random()
+        if mandelbrot(complex(xmin + u * width, ymin + v * height), max_iterations) == max_iterations:
+            inside += 1
+    return inside
+
+def _count_task(args):
+    return count_inside(*args)
+
+def t_quantile(confidence, dof):
+
+    """
+        Two-sided Student t quantile from the Cornish-Fisher expansion around the normal quantile.
+        It is within 0.005 of the exact value from 5 degrees of freedom on.
+    """
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return (z + (z**3 + z) / (4 * dof) + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * dof**2)
+            + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * dof**3))
+
+def stream_area_estimates(xmin, xmax, ymin, ymax, max_iterations, method="halton", batch_size=2**14,
+                          replicas=16, backend="threads", workers=None, confidence=0.95, seed=0):
+
+    """
+        Estimate the area of the Mandelbrot set inside a region, one batch at a time.
+
+        Every batch adds 'batch_size' samples to each of 'replicas' independent estimators: Halton
+        sequences with their own random shift, stratified grids with their own jitter, or plain
+        random points. Each worker only returns how many of its samples are inside, so the samples
+        are never stored or sent between processes. The spread of the replicas gives the
+        confidence interval, which is valid for the low-discrepancy methods as well.
+
+        Parameters:
+            xmin (float): The minimum value of the real part of the region.
+            xmax (float): The maximum value of the real part of the region.
+            ymin (float): The minimum value of the imaginary part of the region.
+            ymax (float): The maximum value of the imaginary part of the region.
+            max_iterations (int): Samples that have not escaped after this many iterations count as inside.
+            method (str): One of METHODS.
+            batch_size (int): Samples per replica and batch. For "stratified" it is rounded down
+                to a square, so that every batch covers each stratum once.
+            replicas (int): The number of independent estimators, at least 2.
+            backend (str): "threads", "processes" or "serial".
+            workers (int): The number of threads or processes; all cores when None.
+            confidence (float): The confidence level of the interval.
+            seed (int): The seed of the shifts and of the random numbers.
+
+        Yields:
+            dict: After every batch, 'samples' (over all replicas), 'estimate', 'half_width' of
+                the confidence interval, 'low', 'high', 'seconds' and 'samples_per_second'.
+    """
+
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+    if replicas < 2:
+        raise ValueError("At least two replicas are needed for a confidence interval")
+    if backend not in ("threads", "processes", "serial"):
+        raise ValueError(f"Unknown backend '{backend}', expected 'threads', 'processes' or 'serial'")
+
+    strata = math.isqrt(batch_size)
+    if method == "stratified":
+        batch_size = strata * strata
+    workers = 1 if backend == "serial" else workers or cpu_count()
+    region = (xmin, xmax - xmin, ymin, ymax - ymin)
+    region_area = (xmax - xmin) * (ymax - ymin)
+    shifts = np.random.default_rng(seed).random((replicas, 2))
+    t = t_quantile(confidence, replicas - 1)
+    chunk = -(-batch_size // workers)
+    method_index = METHODS.index(method)
+    inside = np.zeros(replicas, dtype=np.int64)
+
+    if backend == "threads":
+        pool = ThreadPoolExecutor(max_workers=workers)
+        run = pool.map
+    elif backend == "processes":
+        pool = Pool(processes=workers)
+        run = pool.map
+    else:
+        pool = None
+        run = map
+
+    try:
+        start_time = time.perf_counter()
+        done = 0
+        while True:
+            tasks = []
+            for r in range(replicas):
+                for start in range(done, done + batch_size, chunk):
+                    stop = min(start + chunk, done + batch_size)
+                    task_seed = int(np.random.SeedSequence([seed, r, start]).generate_state(1)[0])
+                    tasks.append((method_index, start, stop, task_seed, shifts[r, 0], shifts[r, 1], strata,
+                                  *region, max_iterations))
+            counts = list(run(_count_task, tasks))
+            per_replica = len(counts) // replicas
+            for r in range(replicas):
+                inside[r] += sum(counts[r * per_replica:(r + 1) * per_replica])
+            done += batch_size
+
+            estimates = region_area * inside / done
+            estimate = estimates.mean()
+            half_width = t * estimates.std(ddof=1) / math.sqrt(replicas)
+            seconds = time.perf_counter() - start_time
+            yield {
+                "samples": done * replicas,
+                "estimate": estimate,
+                "half_width": half_width,
+                "low": estimate - half_width,
+                "high": estimate + half_width,
+                "seconds": seconds,
+                "samples_per_second": done * replicas / seconds,
+            }
+    finally:
+        if backend == "threads":
+            pool.shutdown()
+        elif backend == "processes":
+            pool.terminate()
+
+def estimate_area(xmin, xmax, ymin, ymax, max_iterations, target_error=1e-3, max_samples=10**8, **options):
+
+    """
+        Run stream_area_estimates until the half-width of the confidence interval is at most
+        'target_error' or 'max_samples' samples have been drawn.
+
+        Parameters:
+            xmin, xmax, ymin, ymax, max_iterations: See stream_area_estimates.
+            target_error (float): The wanted half-width of the confidence interval, in units of area.
+            max_samples (int): The most samples to draw over all replicas.
+            **options: Passed on to stream_area_estimates.
+
+        Returns:
+            dict: The last running estimate, see stream_area_estimates, with 'converged' added.
+    """
+
+    for result in stream_area_estimates(xmin, xmax, ymin, ymax, max_iterations, **options):
+        if result["half_width"] <= target_error or result["samples"] >= max_samples:
+            break
+    result["converged"] = result["half_width"] <= target_error
+    return result
+
+def grid_area(n, xmin, xmax, ymin, ymax, max_iterations):
+
+    """
+        Estimate the area by counting the cells of an n x n grid that never escape.
+    """
+
+    from render_engines import get_engine
+    counts, _ = get_engine("numba").compute(n, n, xmin, xmax, ymin, ymax, max_iterations)
+    return (xmax - xmin) * (ymax - ymin) * np.count_nonzero(counts == max_iterations) / (n * n)
+
+def main():
+
+    """
+        Compare the convergence of the sampling methods and of grid counting against the known area.
+    """
+
+    view = (-2.0, 1.0, -1.5, 1.5)
+    max_iterations = 2000
+    count_inside(0, 0, 1, 0, 0.0, 0.0, 1, 0.0, 1.0, 0.0, 1.0, 1)
+    print(f"Reference area {REFERENCE_AREA} (finite iteration limits overestimate it slightly)")
+
+    for method in METHODS:
+        print(f"{method}:")
+        for result in stream_area_estimates(*view, max_iterations, method=method, batch_size=2**12, replicas=8):
+            if result["samples"] & (result["samples"] - 1) == 0:
+                print(f"  {result['samples']:>9} samples: {result['estimate']:.5f} +- {result['half_width']:.5f}, "
+                      f"error {abs(result['estimate'] - REFERENCE_AREA):.5f}, "
+                      f"{result['samples_per_second']:,.0f} samples/s")
+            if result["samples"] >= 2**21:
+                break
+
+    print("grid counting:")
+    grid_area(8, *view, 1)
+    for n in (64, 128, 256, 512, 1024, 1448):
+        start_time = time.perf_counter()
+        area = grid_area(n, *view, max_iterations)
+        seconds = time.perf_counter() - start_time
+        print(f"  {n * n:>9} cells: {area:.5f}, error {abs(area - REFERENCE_AREA):.5f}, "
+              f"{n * n / seconds:,.0f} cells/s")
+
+    result = estimate_area(*view, max_iterations, target_error=2e-3)
+    print(f"Target 0.002 reached after {result['samples']} samples in {result['seconds']:.2f} seconds: "
+          f"{result['estimate']:.5f} [{result['low']:.5f}, {result['high']:.5f}]")
+
+if __name__ == "__main__":
+    main()
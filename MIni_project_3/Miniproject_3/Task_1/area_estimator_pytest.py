@@ -0,0 +1,54 @@
+import pytest
+from area_estimator import (radical_inverse, count_inside, t_quantile, stream_area_estimates, estimate_area,
+                            REFERENCE_AREA, METHODS)
+from numba_approach import mandelbrot
+
+VIEW = (-2.0, 1.0, -1.5, 1.5)
+
+def test_radical_inverse():
+    assert [radical_inverse(i, 2) for i in range(1, 5)] == [0.5, 0.25, 0.75, 0.125]
+    assert radical_inverse(5, 3) == pytest.approx(2 / 3 + 1 / 9)
+
+@pytest.mark.parametrize("dof, expected", [(4, 2.776), (9, 2.262), (30, 2.042)])
+def test_t_quantile(dof, expected):
+    assert t_quantile(0.95, dof) == pytest.approx(expected, abs=0.01)
+
+def test_halton_count_matches_direct():
+    inside = count_inside(0, 10, 500, 0, 0.25, 0.5, 1, -2.0, 3.0, -1.5, 3.0, 80)
+    expected = 0
+    for i in range(10, 500):
+        u = (radical_inverse(i + 1, 2) + 0.25) % 1.0
+        v = (radical_inverse(i + 1, 3) + 0.5) % 1.0
+        expected += mandelbrot(complex(-2.0 + 3.0 * u, -1.5 + 3.0 * v), 80) == 80
+    assert inside == expected
+
+def test_region_inside_the_set_has_exact_area():
+    result = estimate_area(-0.2, 0.1, -0.1, 0.1, 100, batch_size=256, replicas=4, backend="serial")
+    assert result["estimate"] == pytest.approx(0.3 * 0.2)
+    assert result["half_width"] == 0
+    assert result["converged"]
+
+@pytest.mark.parametrize("method", METHODS)
+def test_estimate_reaches_target(method):
+    result = estimate_area(*VIEW, 300, target_error=0.02, batch_size=1024, replicas=8, method=method)
+    assert result["converged"]
+    assert result["half_width"] <= 0.02
+    assert abs(result["estimate"] - REFERENCE_AREA) < 0.05
+
+@pytest.mark.parametrize("backend", ["threads", "processes"])
+def test_halton_reduction_does_not_depend_on_workers(backend):
+    def first_batches(**options):
+        stream = stream_area_estimates(*VIEW, 100, batch_size=500, replicas=3, **options)
+        results = [next(stream)["estimate"] for _ in range(2)]
+        stream.close()
+        return results
+    assert first_batches(backend="serial") == first_batches(backend=backend, workers=3)
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        next(stream_area_estimates(*VIEW, 100, method="sobol"))
+    with pytest.raises(ValueError):
+        next(stream_area_estimates(*VIEW, 100, replicas=1))
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,167 @@
+import time
+from multiprocessing import Pool, cpu_count
+import numpy as np
+
+SAMPLE_REGION = (-2.0, 2.0, -2.0, 2.0)
+
+BATCH_SIZE = 2**16
+
+def sample_batch(rng, size, region=SAMPLE_REGION):
+
+    """
+        Draw 'size' points 'c' uniformly from 'region', given as (xmin, xmax, ymin, ymax).
+
+        Returns:
+            tuple: (c_real, c_imag), two float64 arrays.
+    """
+
+    xmin, xmax, ymin, ymax = region
+    return rng.uniform(xmin, xmax, size), rng.uniform(ymin, ymax, size)
+
+def _histogram_mapping(width, height, xmin, xmax, ymin, ymax):
+    return xmin, ymin, width / (xmax - xmin), height / (ymax - ymin)
+
+def _process_worker(args):
+    seed, samples, batch_size, width, height, view, max_iterations = args
+    import numba_render_kernels
+    rng = np.random.default_rng(seed)
+    histogram = np.zeros((height, width), dtype=np.int64)
+    mapping = _histogram_mapping(width, height, *view)
+    rejected = escaped = 0
+    start_time = time.perf_counter()
+    for start in range(0, samples, batch_size):
+        c_real, c_imag = sample_batch(rng, min(batch_size, samples - start))
+        r, e = numba_render_kernels.buddhabrot_orbits(c_real, c_imag, max_iterations, *mapping, histogram)
+        rejected += r
+        escaped += e
+    return histogram, rejected, escaped, time.perf_counter() - start_time
+
+def render_buddhabrot(width, height, xmin, xmax, ymin, ymax, max_iterations, samples, batch_size=BATCH_SIZE,
+                      processes=False, workers=None, seed=0):
+
+    """
+        Render the orbit density (Buddhabrot) of the Mandelbrot set.
+
+        Points 'c' are sampled uniformly from SAMPLE_REGION in batches. Every worker fills its
+        own histogram and the histograms are summed once at the end, so no hit is contended.
+
+        Parameters:
+            width (int): The width of the image (number of pixels).
+            height (int): The height of the image (number of pixels).
+            xmin (float): The minimum value of the real part of the complex plane.
+            xmax (float): The maximum value of the real part of the complex plane.
+            ymin (float): The minimum value of the imaginary part of the complex plane.
+            ymax (float): The maximum value of the imaginary part of the complex plane.
+            max_iterations (int): Samples still bounded after this many iterations are dropped.
+            samples (int): The number of points 'c' to draw.
+            batch_size (int): The number of points drawn at a time.
+            processes (bool): Run one process per worker with the serial kernel instead of the
+                Numba-parallel kernel in this process.
+            workers (int): The number of processes or threads; all cores when None.
+            seed (int): The seed of the samples.
+
+        Returns:
+            tuple: (histogram, stats). 'histogram' is an int64 array of shape (height, width)
+                whose row 0 corresponds to 'ymin'. 'stats' holds 'samples', 'rejected', 'escaped',
+                'workers', 'seconds', 'samples_per_second', 'merge_seconds' and 'histogram_bytes',
+                the memory of all per-worker histograms.
+    """
+
+    view = (xmin, xmax, ymin, ymax)
+    start_time = time.perf_counter()
+
+    if processes:
+        workers = workers or cpu_count()
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        shares = [samples // workers + (k < samples % workers) for k in range(workers)]
+        tasks = [(s, n, batch_size, width, height, view, max_iterations) for s, n in zip(seeds, shares)]
+        with Pool(processes=workers) as pool:
+            results = pool.map(_process_worker, tasks)
+        histograms = [histogram for histogram, _, _, _ in results]
+        rejected = sum(r for _, r, _, _ in results)
+        escaped = sum(e for _, _, e, _ in results)
+        compute_time = time.perf_counter()
+        histogram = histograms[0]
+        for other in histograms[1:]:
+            histogram += other
+    else:
+        import numba
+        import numba_render_kernels
+        # Only change the thread count for this call, not for the other prange kernels
+        previous_threads = numba.get_num_threads()
+        if workers is not None:
+            numba.set_num_threads(workers)
+        try:
+            workers = numba.get_num_threads()
+            rng = np.random.default_rng(seed)
+            histograms = np.zeros((workers, height, width), dtype=np.int64)
+            mapping = _histogram_mapping(width, height, *view)
+            rejected = escaped = 0
+            for start in range(0, samples, batch_size):
+                c_real, c_imag = sample_batch(rng, min(batch_size, samples - start))
+                totals = numba_render_kernels.buddhabrot_parallel(c_real, c_imag, max_iterations, *mapping, histograms)
+                rejected += int(totals[:, 0].sum())
+                escaped += int(totals[:, 1].sum())
+        finally:
+            numba.set_num_threads(previous_threads)
+        compute_time = time.perf_counter()
+        histogram = histograms.sum(axis=0)
+
+    end_time = time.perf_counter()
+    return histogram, {
+        "samples": samples,
+        "rejected": rejected,
+        "escaped": escaped,
+        "workers": workers,
+        "seconds": end_time - start_time,
+        "samples_per_second": samples / (compute_time - start_time),
+        "merge_seconds": end_time - compute_time,
+        "histogram_bytes": workers * histogram.nbytes,
+    }
+
+def density_to_rgb(histogram, palette="grey"):
+
+    """
+        Map an orbit-density histogram to colours, using the square root of the density so
+        the faint outer orbits stay visible next to the dense core.
+
+        Returns:
+            numpy.ndarray: A uint8 array of shape (height, width, 3) for render_pipeline.write_png.
+    """
+
+    from render_pipeline import get_palette
+    lut = get_palette(palette)
+    density = np.sqrt(histogram, dtype=np.float64)
+    if density.max() > 0:
+        density *= (len(lut) - 1) / density.max()
+    return lut.take(density.astype(np.intp), axis=0)
+
+def main():
+
+    """
+        Render the same Buddhabrot with the Numba-parallel and the multiprocessing paths and
+        report sampling throughput and merge cost.
+    """
+
+    from render_pipeline import write_png
+
+    width, height = 600, 600
+    x_min, x_max = -2.0, 1.0
+    y_min, y_max = -1.5, 1.5
+    max_iterations = 500
+    samples = 2_000_000
+
+    # Compile the kernels before timing
+    render_buddhabrot(8, 8, x_min, x_max, y_min, y_max, 10, 100)
+    for processes in (False, True):
+        histogram, stats = render_buddhabrot(width, height, x_min, x_max, y_min, y_max, max_iterations, samples,
+                                             processes=processes)
+        name = "multiprocessing" if processes else "numba-parallel"
+        print(f"{name}: {stats['samples_per_second']:,.0f} samples/s over {stats['workers']} workers, "
+              f"{stats['rejected'] / samples:.0%} rejected, {stats['escaped'] / samples:.0%} escaping, "
+              f"merge {stats['merge_seconds'] * 1000:.1f} ms for {stats['histogram_bytes'] / 2**20:.1f} MiB "
+              f"of histograms, total {stats['seconds']:.2f} seconds")
+    write_png("buddhabrot.png", density_to_rgb(histogram))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+import numba_render_kernels
+from buddhabrot import render_buddhabrot, sample_batch
+
+VIEW = (-2.0, 1.0, -1.5, 1.5)
+
+def reference_histogram(c_values, width, height, xmin, xmax, ymin, ymax, max_iterations):
+    histogram = np.zeros((height, width), dtype=np.int64)
+    for c in c_values:
+        orbit = []
+        z = 0j
+        for _ in range(max_iterations):
+            z = z*z + c
+            orbit.append(z)
+            if z.real * z.real + z.imag * z.imag > 4:
+                break
+        else:
+            continue
+        for z in orbit:
+            column = (z.real - xmin) * width / (xmax - xmin)
+            row = (z.imag - ymin) * height / (ymax - ymin)
+            if 0 <= column < width and 0 <= row < height:
+                histogram[int(row), int(column)] += 1
+    return histogram
+
+def mapping(width, height):
+    return VIEW[0], VIEW[2], width / (VIEW[1] - VIEW[0]), height / (VIEW[3] - VIEW[2])
+
+def test_orbits_match_reference():
+    c_real, c_imag = sample_batch(np.random.default_rng(1), 500)
+    histogram = np.zeros((30, 40), dtype=np.int64)
+    rejected, escaped = numba_render_kernels.buddhabrot_orbits(c_real, c_imag, 50, *mapping(40, 30), histogram)
+    expected = reference_histogram(c_real + 1j * c_imag, 40, 30, *VIEW, 50)
+    np.testing.assert_array_equal(histogram, expected)
+    assert rejected > 0 and escaped > 0
+
+def test_cardioid_and_bulb_are_rejected():
+    histogram = np.zeros((4, 4), dtype=np.int64)
+    c_real = np.array([0.0, -1.0, -0.1, 0.3])
+    c_imag = np.array([0.0, 0.0, 0.2, 0.0])
+    rejected, escaped = numba_render_kernels.buddhabrot_orbits(c_real, c_imag, 100, *mapping(4, 4), histogram)
+    assert (rejected, escaped) == (3, 1)
+
+def test_orbit_escaping_on_the_last_iteration_is_deposited():
+    c_real = np.array([0.3, -0.75])
+    c_imag = np.array([0.0, 0.1])
+    for k in range(2):
+        # Use the escape count of the sample as the limit, so it escapes on the very last update
+        max_iterations = numba_render_kernels.mandelbrot_block(c_real[k:k + 1], c_imag[k:k + 1], 1000)[0, 0]
+        assert max_iterations < 1000
+        histogram = np.zeros((30, 40), dtype=np.int64)
+        rejected, escaped = numba_render_kernels.buddhabrot_orbits(c_real[k:k + 1], c_imag[k:k + 1], max_iterations,
+                                                                   *mapping(40, 30), histogram)
+        assert (rejected, escaped) == (0, 1)
+        expected = reference_histogram([complex(c_real[k], c_imag[k])], 40, 30, *VIEW, max_iterations)
+        assert expected.sum() > 0
+        np.testing.assert_array_equal(histogram, expected)
+
+def test_render_buddhabrot_restores_the_thread_count():
+    import numba
+    threads = numba.get_num_threads()
+    if threads < 2:
+        pytest.skip("needs at least two Numba threads")
+    render_buddhabrot(8, 8, *VIEW, 20, 500, batch_size=250, workers=1)
+    assert numba.get_num_threads() == threads
+
+def test_parallel_histograms_merge_to_serial():
+    c_real, c_imag = sample_batch(np.random.default_rng(2), 2000)
+    serial = np.zeros((20, 20), dtype=np.int64)
+    expected = numba_render_kernels.buddhabrot_orbits(c_real, c_imag, 80, *mapping(20, 20), serial)
+    histograms = np.zeros((3, 20, 20), dtype=np.int64)
+    totals = numba_render_kernels.buddhabrot_parallel(c_real, c_imag, 80, *mapping(20, 20), histograms)
+    np.testing.assert_array_equal(histograms.sum(axis=0), serial)
+    assert tuple(totals.sum(axis=0)) == expected
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_render_buddhabrot_stats(processes):
+    histogram, stats = render_buddhabrot(32, 32, *VIEW, 100, 20_000, batch_size=3000, processes=processes, workers=2 if processes else None)
+    assert histogram.shape == (32, 32)
+    assert histogram.sum() > 0
+    assert stats["samples"] == 20_000
+    assert 0 < stats["escaped"] < stats["samples"] - stats["rejected"]
+    assert stats["samples_per_second"] > 0 and stats["merge_seconds"] >= 0
+    assert stats["histogram_bytes"] == stats["workers"] * histogram.nbytes
+
+def test_numba_path_is_reproducible():
+    first, _ = render_buddhabrot(24, 24, *VIEW, 60, 5000, batch_size=1000, seed=7)
+    second, _ = render_buddhabrot(24, 24, *VIEW, 60, 5000, batch_size=1000, seed=7)
+    np.testing.assert_array_equal(first, second)
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,3 @@
+import numba_render_kernels
+
+numba_render_kernels.prefer_fork_safe_threading()
@@ -0,0 +1,165 @@
+import time
+from functools import partial
+import numpy as np
+import dask
+import dask.array as da
+from render_engines import axis_coordinates
+
+TARGET_CHUNK_BYTES = 4 * 2**20
+
+KERNEL_TOKEN = "mandelbrot_block"
+
+def choose_chunks(height, width, target_chunk_bytes=TARGET_CHUNK_BYTES, itemsize=4):
+
+    """
+        Choose the chunk shape of the output array from a target number of bytes per chunk.
+
+        Chunks are bands of full rows, so each task works on contiguous memory; only when a
+        single row is larger than the target are the rows split into column blocks as well.
+
+        Parameters:
+            height (int): The number of rows of the output array.
+            width (int): The number of columns of the output array.
+            target_chunk_bytes (int): The wanted size of one output chunk.
+            itemsize (int): The size in bytes of one output element.
+
+        Returns:
+            tuple: (rows_per_chunk, columns_per_chunk).
+    """
+
+    row_bytes = width * itemsize
+    if row_bytes <= target_chunk_bytes:
+        return min(height, max(1, target_chunk_bytes // row_bytes)), width
+    return 1, max(1, target_chunk_bytes // itemsize)
+
+def _block_kernel(imag, real, max_iterations, durations=None):
+    import numba_render_kernels
+    start_time = time.perf_counter()
+    block = numba_render_kernels.mandelbrot_block(real.ravel(), imag.ravel(), max_iterations)
+    if durations is not None:
+        durations.append(time.perf_counter() - start_time)
+    return block
+
+def generate_mandelbrot_dask(width, height, xmin, xmax, ymin, ymax, max_iterations,
+                             target_chunk_bytes=TARGET_CHUNK_BYTES, durations=None):
+
+    """
+        Build a lazy Dask array of the Mandelbrot set with one task per chunk.
+
+        The coordinates are split into chunks and combined with map_blocks, so the graph has one
+        compiled-kernel task per output chunk instead of one delayed task per row followed by a
+        stack and a rechunk.
+
+        Parameters:
+            width (int): The width of the output array (number of columns).
+            height (int): The height of the output array (number of rows).
+            xmin (float): The minimum value of the real part of the complex numbers.
+            xmax (float): The maximum value of the real part of the complex numbers.
+            ymin (float): The minimum value of the imaginary part of the complex numbers.
+            ymax (float): The maximum value of the imaginary part of the complex numbers.
+            max_iterations (int): The maximum number of iterations for each complex number.
+            target_chunk_bytes (int): The wanted size of one output chunk, see choose_chunks.
+            durations (list): If given, the time spent in the kernel by every task is appended
+                to it. Only useful with the threaded scheduler, where tasks share memory.
+
+        Returns:
+            dask.array.Array: An int32 array of shape (height, width); row 0 corresponds to 'ymin'.
+    """
+
+    rows_per_chunk, columns_per_chunk = choose_chunks(height, width, target_chunk_bytes)
+    imag = da.from_array(axis_coordinates(height, ymin, ymax), chunks=rows_per_chunk)[:, np.newaxis]
+    real = da.from_array(axis_coordinates(width, xmin, xmax), chunks=columns_per_chunk)[np.newaxis, :]
+    return da.map_blocks(partial(_block_kernel, max_iterations=max_iterations, durations=durations), imag, real,
+                         chunks=(imag.chunks[0], real.chunks[1]), dtype=np.int32,
+                         meta=np.empty((0, 0), dtype=np.int32), token=KERNEL_TOKEN)
+
+def _key_name(key):
+    return key[0] if isinstance(key, tuple) else str(key)
+
+def benchmark_dask(width, height, xmin, xmax, ymin, ymax, max_iterations, client=None,
+                   target_chunk_bytes=TARGET_CHUNK_BYTES):
+
+    """
+        Time graph construction, kernel compute and scheduling separately for one render.
+
+        Parameters:
+            width, height, xmin, xmax, ymin, ymax, max_iterations: See generate_mandelbrot_dask.
+            client (dask.distributed.Client): The cluster to compute on. The threaded scheduler is
+                used when None.
+            target_chunk_bytes (int): The wanted size of one output chunk.
+
+        Returns:
+            dict: 'tasks' (the number of keys in the graph), 'chunks', 'graph_seconds' (building
+                the graph), 'wall_seconds' (computing it), 'compute_seconds' (the time spent in the
+                kernel, summed over tasks), 'workers' and 'overhead_seconds', the part of the wall
+                time not explained by the kernel time spread over the workers.
+    """
+
+    durations = [] if client is None else None
+    start_time = time.perf_counter()
+    mandelbrot_set = generate_mandelbrot_dask(width, height, xmin, xmax, ymin, ymax, max_iterations,
+                                              target_chunk_bytes, durations)
+    tasks = len(dict(mandelbrot_set.__dask_graph__()))
+    graph_seconds = time.perf_counter() - start_time
+
+    if client is None:
+        workers = dask.config.get("num_workers", None) or dask.system.CPU_COUNT
+        start_time = time.perf_counter()
+        mandelbrot_set.compute(scheduler="threads")
+        wall_seconds = time.perf_counter() - start_time
+        compute_seconds = sum(durations)
+    else:
+        from dask.distributed import get_task_stream
+        workers = sum(client.nthreads().values())
+        with get_task_stream(client) as task_stream:
+            start_time = time.perf_counter()
+            client.compute(mandelbrot_set).result()
+            wall_seconds = time.perf_counter() - start_time
+        compute_seconds = sum(part["stop"] - part["start"] for task in task_stream.data
+                              for part in task["startstops"] if part["action"] == "compute"
+                              and _key_name(task["key"]).startswith(KERNEL_TOKEN))
+
+    return {
+        "tasks": tasks,
+        "chunks": mandelbrot_set.numblocks,
+        "graph_seconds": graph_seconds,
+        "wall_seconds": wall_seconds,
+        "compute_seconds": compute_seconds,
+        "workers": workers,
+        "overhead_seconds": max(0.0, wall_seconds - compute_seconds / workers),
+    }
+
+def main():
+
+    """
+        Compare the threaded scheduler and a LocalCluster for a few chunk sizes.
+    """
+
+    from dask.distributed import Client, LocalCluster
+
+    width, height = 1000, 1000
+    x_min, x_max = -2.0, 1.0
+    y_min, y_max = -1.5, 1.5
+    max_iterations = 100
+
+    # Compile the kernel before timing anything
+    generate_mandelbrot_dask(8, 8, x_min, x_max, y_min, y_max, 1).compute(scheduler="threads")
+
+    cluster = LocalCluster()
+    client = Client(cluster)
+    client.run(lambda: generate_mandelbrot_dask(8, 8, x_min, x_max, y_min, y_max, 1).compute(scheduler="sync"))
+
+    for target_chunk_bytes in (64 * 2**10, 2**20, 4 * 2**20):
+        for name, scheduler in (("threads", None), ("LocalCluster", client)):
+            stats = benchmark_dask(width, height, x_min, x_max, y_min, y_max, max_iterations, client=scheduler,
+                                   target_chunk_bytes=target_chunk_bytes)
+            print(f"{name}, {target_chunk_bytes // 1024} KiB chunks: {stats['tasks']} tasks, "
+                  f"graph {stats['graph_seconds']:.3f} s, wall {stats['wall_seconds']:.3f} s, "
+                  f"compute {stats['compute_seconds']:.3f} s over {stats['workers']} workers, "
+                  f"scheduler overhead {stats['overhead_seconds']:.3f} s")
+
+    client.close()
+    cluster.close()
+
+if __name__ == "__main__":
+    main()
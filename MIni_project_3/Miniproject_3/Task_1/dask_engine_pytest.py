@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from dask_engine import choose_chunks, generate_mandelbrot_dask, benchmark_dask
+from render_engines import get_engine
+
+def test_choose_chunks():
+    assert choose_chunks(1000, 1000, target_chunk_bytes=400000) == (100, 1000)
+    assert choose_chunks(10, 1000, target_chunk_bytes=400000) == (10, 1000)
+    assert choose_chunks(10, 1000, target_chunk_bytes=1000) == (1, 250)
+
+def test_generate_mandelbrot_dask_metadata():
+    mandelbrot_set = generate_mandelbrot_dask(50, 40, -2.0, 1.0, -1.5, 1.5, 30, target_chunk_bytes=50 * 4 * 8)
+    assert mandelbrot_set.dtype == np.int32
+    assert mandelbrot_set.chunks == ((8, 8, 8, 8, 8), (50,))
+    result = mandelbrot_set.compute(scheduler="threads")
+    assert result.dtype == np.int32 and result.shape == (40, 50)
+
+def test_matches_numba_engine():
+    expected, _ = get_engine("numba").compute(37, 29, -2.0, 1.0, -0.5, 1.5, 60)
+    result = generate_mandelbrot_dask(37, 29, -2.0, 1.0, -0.5, 1.5, 60, target_chunk_bytes=100).compute(scheduler="threads")
+    np.testing.assert_array_equal(result, expected)
+
+def test_benchmark_threads():
+    stats = benchmark_dask(64, 64, -2.0, 1.0, -1.5, 1.5, 50, target_chunk_bytes=64 * 4 * 16)
+    assert stats["chunks"] == (4, 1)
+    assert stats["compute_seconds"] > 0
+    assert stats["tasks"] < 64
+
+if __name__ == "__main__":
+    pytest.main()
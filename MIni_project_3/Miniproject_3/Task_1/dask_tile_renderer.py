@@ -0,0 +1,150 @@
+import time
+import numpy as np
+from dask.distributed import as_completed
+from distributed.diagnostics.plugin import WorkerPlugin
+from render_engines import axis_coordinates
+
+class KernelWarmup(WorkerPlugin):
+
+    """
+        Worker plugin that imports and compiles the tile kernel as soon as a worker starts.
+        Workers started later, for instance to replace one that died, run it as well, so the
+        compiled kernel stays resident on every worker and tiles never pay for compilation.
+    """
+
+    name = "mandelbrot-kernel"
+
+    def setup(self, worker):
+        import numba_render_kernels
+        axis = np.zeros(1, dtype=np.float64)
+        numba_render_kernels.mandelbrot_block(axis, axis, 1)
+
+def split_tiles(height, width, tile_rows, tile_columns):
+
+    """
+        Split a height x width image into tiles.
+
+        Returns:
+            list: (row_start, row_stop, column_start, column_stop) for every tile, row by row.
+    """
+
+    return [(r, min(r + tile_rows, height), c, min(c + tile_columns, width))
+            for r in range(0, height, tile_rows) for c in range(0, width, tile_columns)]
+
+def render_tile(real, imag, max_iterations):
+
+    """
+        Compute one tile on a worker with the resident numba kernel.
+
+        Parameters:
+            real (numpy.ndarray): The real coordinate of every column of the tile.
+            imag (numpy.ndarray): The imaginary coordinate of every row of the tile.
+            max_iterations (int): The maximum number of iterations for each complex number.
+
+        Returns:
+            numpy.ndarray: The int32 escape counts of the tile.
+    """
+
+    import numba_render_kernels
+    return numba_render_kernels.mandelbrot_block(real, imag, max_iterations)
+
+def render_distributed(client, width, height, xmin, xmax, ymin, ymax, max_iterations, out=None,
+                       tile_shape=(128, 128), max_attempts=3, on_tile=None):
+
+    """
+        Render the Mandelbrot set on a Dask cluster, one future per tile, streaming tiles into 'out'.
+
+        Tiles are written as soon as they finish, in completion order, and their futures are
+        released straight away, so the cluster never holds the whole image. Tasks lost with a
+        worker are recomputed by the scheduler; a tile whose task still fails (for example with
+        KilledWorker after repeated worker deaths) is resubmitted up to 'max_attempts' times.
+
+        Parameters:
+            client (dask.distributed.Client): The cluster to render on.
+            width (int): The width of the output array (number of columns).
+            height (int): The height of the output array (number of rows).
+            xmin (float): The minimum value of the real part of the complex numbers.
+            xmax (float): The maximum value of the real part of the complex numbers.
+            ymin (float): The minimum value of the imaginary part of the complex numbers.
+            ymax (float): The maximum value of the imaginary part of the complex numbers.
+            max_iterations (int): The maximum number of iterations for each complex number.
+            out (numpy.ndarray or str): An int32 array of shape (height, width) to fill, or the
+                name of a .npy file to create as a memmap. A new array is allocated when None.
+            tile_shape (tuple): (rows, columns) of a tile.
+            max_attempts (int): How many times a tile may be submitted before giving up.
+            on_tile (callable): Called as on_tile(tile, block) after each tile is written.
+
+        Returns:
+            tuple: (image, stats). 'stats' holds 'tiles', 'resubmitted' and 'seconds'.
+    """
+
+    if out is None:
+        out = np.empty((height, width), dtype=np.int32)
+    elif isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode="w+", dtype=np.int32, shape=(height, width))
+    elif out.shape != (height, width) or out.dtype != np.int32:
+        raise ValueError(f"'out' must be an int32 array of shape {(height, width)}")
+
+    client.register_plugin(KernelWarmup(), name=KernelWarmup.name)
+    real = axis_coordinates(width, xmin, xmax)
+    imag = axis_coordinates(height, ymin, ymax)
+
+    start_time = time.perf_counter()
+    tiles = {}
+    attempts = {}
+
+    def submit(tile):
+        r0, r1, c0, c1 = tile
+        future = client.submit(render_tile, real[c0:c1], imag[r0:r1], max_iterations, pure=False)
+        tiles[future.key] = tile
+        attempts[tile] = attempts.get(tile, 0) + 1
+        return future
+
+    futures = as_completed([submit(tile) for tile in split_tiles(height, width, *tile_shape)])
+    resubmitted = 0
+    for future in futures:
+        tile = tiles.pop(future.key)
+        if future.status != "finished":
+            if attempts[tile] >= max_attempts:
+                raise RuntimeError(f"Tile {tile} failed {attempts[tile]} times") from future.exception()
+            futures.add(submit(tile))
+            resubmitted += 1
+            continue
+        r0, r1, c0, c1 = tile
+        block = future.result()
+        out[r0:r1, c0:c1] = block
+        future.release()
+        if on_tile is not None:
+            on_tile(tile, block)
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out, {"tiles": len(attempts), "resubmitted": resubmitted, "seconds": time.perf_counter() - start_time}
+
+def main():
+
+    """
+        Measure the scaling efficiency from 1 to N single-threaded worker processes.
+    """
+
+    import os
+    from dask.distributed import Client, LocalCluster
+
+    width, height = 2000, 2000
+    x_min, x_max = -2.0, 1.0
+    y_min, y_max = -1.5, 1.5
+    max_iterations = 200
+    max_workers = os.cpu_count()
+
+    baseline = None
+    for n_workers in range(1, max_workers + 1):
+        with LocalCluster(n_workers=n_workers, threads_per_worker=1, processes=True) as cluster, Client(cluster) as client:
+            render_distributed(client, 64, 64, x_min, x_max, y_min, y_max, 1)
+            _, stats = render_distributed(client, width, height, x_min, x_max, y_min, y_max, max_iterations)
+        baseline = baseline or stats["seconds"]
+        efficiency = baseline / (n_workers * stats["seconds"])
+        print(f"{n_workers} workers: {stats['seconds']:.2f} seconds for {stats['tiles']} tiles, "
+              f"speedup {baseline / stats['seconds']:.2f}x, efficiency {efficiency:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+import signal
+import numpy as np
+import pytest
+from dask.distributed import Client, LocalCluster
+from dask_tile_renderer import split_tiles, render_distributed
+from render_engines import get_engine
+
+VIEW = (-2.0, 1.0, -1.5, 1.5)
+
+@pytest.fixture(scope="module")
+def client():
+    with LocalCluster(n_workers=2, threads_per_worker=1, processes=True, dashboard_address=None) as cluster:
+        with Client(cluster) as client:
+            yield client
+
+def test_split_tiles_cover_image():
+    tiles = split_tiles(10, 7, 4, 3)
+    covered = np.zeros((10, 7), dtype=int)
+    for r0, r1, c0, c1 in tiles:
+        covered[r0:r1, c0:c1] += 1
+    assert np.all(covered == 1)
+
+def test_render_distributed_matches_engine(client, tmp_path):
+    expected, _ = get_engine("numba").compute(90, 70, *VIEW, 80)
+    seen = []
+    image, stats = render_distributed(client, 90, 70, *VIEW, 80, out=str(tmp_path / "image.npy"), tile_shape=(32, 32),
+                                      on_tile=lambda tile, block: seen.append(tile))
+    np.testing.assert_array_equal(np.load(tmp_path / "image.npy"), expected)
+    assert stats["tiles"] == len(seen) == 9
+
+def test_render_survives_worker_death(client):
+    expected, _ = get_engine("numba").compute(120, 120, *VIEW, 300)
+    killed = []
+
+    def kill_a_worker(tile, block):
+        if not killed:
+            worker, pid = sorted(client.run(os.getpid).items())[0]
+            os.kill(pid, signal.SIGKILL)
+            killed.append(worker)
+
+    image, _ = render_distributed(client, 120, 120, *VIEW, 300, tile_shape=(8, 120), on_tile=kill_a_worker)
+    assert killed
+    np.testing.assert_array_equal(image, expected)
+
+if __name__ == "__main__":
+    pytest.main()
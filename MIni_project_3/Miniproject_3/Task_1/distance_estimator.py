@@ -0,0 +1,206 @@
+import time
+import numpy as np
+from render_engines import axis_coordinates, get_engine
+
+DISTANCE_ENGINES = ("numba", "opencl")
+
+ESCAPE_RADIUS = 1000.0
+
+def _estimate_numba(real, imag, max_iterations, escape_radius_sq):
+    get_engine("numba")
+    import numba_render_kernels
+    values = np.empty((len(imag), len(real)), dtype=np.float64)
+    distances = np.empty_like(values)
+    numba_render_kernels.distance_estimate_grid(real, imag, max_iterations, escape_radius_sq, values, distances)
+    return values, distances
+
+def _supersample_numba(values, rows, cols, sides, real, imag, pixel_dx, pixel_dy, max_iterations, escape_radius_sq):
+    import numba_render_kernels
+    numba_render_kernels.supersample_pixels(rows, cols, sides, real, imag, pixel_dx, pixel_dy, max_iterations,
+                                            escape_radius_sq, values)
+
+def _estimate_opencl(real, imag, max_iterations, escape_radius_sq):
+    engine = get_engine("opencl")
+    cl = engine.cl
+    mf = cl.mem_flags
+    kernel = engine.get_kernel("mandelbrot_distance.cl", "calculate_distance_estimate")
+
+    values = np.empty((len(imag), len(real)), dtype=np.float64)
+    distances = np.empty_like(values)
+    real_buf = cl.Buffer(engine.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=real)
+    imag_buf = cl.Buffer(engine.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=imag)
+    values_buf = cl.Buffer(engine.context, mf.WRITE_ONLY, values.nbytes)
+    distances_buf = cl.Buffer(engine.context, mf.WRITE_ONLY, distances.nbytes)
+
+    kernel(engine.queue, (len(real), len(imag)), None, values_buf, distances_buf, real_buf, imag_buf,
+           np.int32(len(real)), np.int32(max_iterations), np.float64(escape_radius_sq))
+    cl.enqueue_copy(engine.queue, values, values_buf)
+    cl.enqueue_copy(engine.queue, distances, distances_buf)
+    return values, distances
+
+def _supersample_opencl(values, rows, cols, sides, real, imag, pixel_dx, pixel_dy, max_iterations, escape_radius_sq):
+    engine = get_engine("opencl")
+    cl = engine.cl
+    mf = cl.mem_flags
+    kernel = engine.get_kernel("mandelbrot_distance.cl", "supersample_pixels")
+
+    values_buf = cl.Buffer(engine.context, mf.READ_WRITE | mf.COPY_HOST_PTR, hostbuf=values)
+    buffers = [cl.Buffer(engine.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=np.ascontiguousarray(a))
+               for a in (rows.astype(np.int32), cols.astype(np.int32), sides.astype(np.int32), real, imag)]
+
+    kernel(engine.queue, (len(rows),), None, values_buf, *buffers, np.float64(pixel_dx), np.float64(pixel_dy),
+           np.int32(len(real)), np.int32(max_iterations), np.float64(escape_radius_sq))
+    cl.enqueue_copy(engine.queue, values, values_buf)
+
+_DISTANCE_KERNELS = {
+    "numba": (_estimate_numba, _supersample_numba),
+    "opencl": (_estimate_opencl, _supersample_opencl),
+}
+
+def _pixel_size(width, height, xmin, xmax, ymin, ymax):
+    return (xmax - xmin) / max(width - 1, 1), (ymax - ymin) / max(height - 1, 1)
+
+def boundary_sample_sides(distances, pixel_size, threshold=1.0, max_samples_per_side=4):
+
+    """
+        Choose how many samples per side every pixel needs.
+
+        Exterior pixels whose distance estimate is below 'threshold' pixels, and interior pixels
+        touching an exterior pixel, get between 2 and 'max_samples_per_side' samples per side,
+        more the closer they are to the boundary. All other pixels keep their single sample.
+
+        Parameters:
+            distances (numpy.ndarray): Distance estimates, negative for interior pixels.
+            pixel_size (float): The size of a pixel in the complex plane.
+            threshold (float): The distance, in pixels, below which a pixel is supersampled.
+            max_samples_per_side (int): The number of samples per side right on the boundary.
+
+        Returns:
+            numpy.ndarray: An int32 array of the same shape, 1 for pixels that are not supersampled.
+    """
+
+    interior = distances < 0
+    exterior = ~interior
+    touches_exterior = np.zeros_like(interior)
+    touches_exterior[1:, :] |= exterior[:-1, :]
+    touches_exterior[:-1, :] |= exterior[1:, :]
+    touches_exterior[:, 1:] |= exterior[:, :-1]
+    touches_exterior[:, :-1] |= exterior[:, 1:]
+
+    limit = threshold * pixel_size
+    nearness = np.where(interior, 1.0, 1.0 - distances / limit)
+    sides = np.ceil(max_samples_per_side * nearness).astype(np.int32)
+    np.clip(sides, 2, max_samples_per_side, out=sides)
+
+    boundary = (exterior & (distances < limit)) | (interior & touches_exterior)
+    return np.where(boundary, sides, 1).astype(np.int32)
+
+def render_antialiased(width, height, xmin, xmax, ymin, ymax, max_iterations, engine="numba", threshold=1.0,
+                       max_samples_per_side=4, escape_radius=ESCAPE_RADIUS):
+
+    """
+        Render an anti-aliased image, supersampling only the pixels near the boundary of the set.
+
+        A first pass computes one sample per pixel together with the exterior distance estimate.
+        Only pixels closer to the boundary than 'threshold' pixels are then sampled again.
+
+        Parameters:
+            width (int): The width of the image (number of pixels).
+            height (int): The height of the image (number of pixels).
+            xmin (float): The real coordinate of the first column.
+            xmax (float): The real coordinate of the last column.
+            ymin (float): The imaginary coordinate of the first row.
+            ymax (float): The imaginary coordinate of the last row.
+            max_iterations (int): The maximum number of iterations.
+            engine (str): One of DISTANCE_ENGINES.
+            threshold (float): The distance, in pixels, below which a pixel is supersampled.
+            max_samples_per_side (int): The number of samples per side right on the boundary.
+            escape_radius (float): The bailout radius.
+
+        Returns:
+            tuple: (image, extra_samples). 'image' is a float64 array of shape (height, width)
+                holding normalized smooth iteration values in [0, 1] (0 inside the set) and
+                'extra_samples' the number of samples taken beyond one per pixel.
+    """
+
+    if engine not in _DISTANCE_KERNELS:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {DISTANCE_ENGINES}")
+    estimate, supersample = _DISTANCE_KERNELS[engine]
+
+    real = axis_coordinates(width, xmin, xmax)
+    imag = axis_coordinates(height, ymin, ymax)
+    pixel_dx, pixel_dy = _pixel_size(width, height, xmin, xmax, ymin, ymax)
+    escape_radius_sq = escape_radius * escape_radius
+
+    values, distances = estimate(real, imag, max_iterations, escape_radius_sq)
+    sides = boundary_sample_sides(distances, max(pixel_dx, pixel_dy), threshold, max_samples_per_side)
+    rows, cols = np.nonzero(sides > 1)
+    if len(rows):
+        supersample(values, rows, cols, sides[rows, cols], real, imag, pixel_dx, pixel_dy, max_iterations,
+                    escape_radius_sq)
+    return values, int((sides[rows, cols] ** 2).sum())
+
+def render_uniform_supersampled(width, height, xmin, xmax, ymin, ymax, max_iterations, samples_per_side,
+                                engine="numba", escape_radius=ESCAPE_RADIUS):
+
+    """
+        Render the same image as render_antialiased with 'samples_per_side' squared samples in every pixel.
+        This is the reference the adaptive mode is measured against.
+    """
+
+    if engine not in _DISTANCE_KERNELS:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {DISTANCE_ENGINES}")
+    _, supersample = _DISTANCE_KERNELS[engine]
+
+    real = axis_coordinates(width, xmin, xmax)
+    imag = axis_coordinates(height, ymin, ymax)
+    pixel_dx, pixel_dy = _pixel_size(width, height, xmin, xmax, ymin, ymax)
+
+    values = np.zeros((height, width), dtype=np.float64)
+    rows, cols = np.divmod(np.arange(width * height), width)
+    sides = np.full(rows.shape, samples_per_side, dtype=np.int32)
+    supersample(values, rows, cols, sides, real, imag, pixel_dx, pixel_dy, max_iterations,
+                escape_radius * escape_radius)
+    return values
+
+def main():
+
+    """
+        Compare adaptive supersampling with uniform supersampling against a 8x8 uniform reference.
+    """
+
+    width, height = 400, 400
+    x_min, x_max = -2.0, 1.0
+    y_min, y_max = -1.5, 1.5
+    max_iterations = 200
+
+    for engine in DISTANCE_ENGINES:
+        try:
+            render_antialiased(16, 16, x_min, x_max, y_min, y_max, 20, engine=engine)
+            render_uniform_supersampled(4, 4, x_min, x_max, y_min, y_max, 1, 2, engine=engine)
+        except Exception as e:
+            print(f"Skipping {engine}: {e}")
+            continue
+
+        reference = render_uniform_supersampled(width, height, x_min, x_max, y_min, y_max, max_iterations, 8,
+                                                engine=engine)
+        print(f"{engine}:")
+        for side in (2, 4, 8):
+            start_time = time.time()
+            image = render_uniform_supersampled(width, height, x_min, x_max, y_min, y_max, max_iterations, side,
+                                                engine=engine)
+            execution_time = time.time() - start_time
+            error = np.abs(image - reference).mean()
+            print(f"  uniform {side}x{side}: {execution_time:.2f} seconds, {side * side * width * height} samples, "
+                  f"mean error {error:.2e}")
+        for side in (4, 8):
+            start_time = time.time()
+            image, extra_samples = render_antialiased(width, height, x_min, x_max, y_min, y_max, max_iterations,
+                                                      engine=engine, max_samples_per_side=side)
+            execution_time = time.time() - start_time
+            error = np.abs(image - reference).mean()
+            print(f"  adaptive up to {side}x{side}: {execution_time:.2f} seconds, "
+                  f"{width * height + extra_samples} samples, mean error {error:.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from distance_estimator import (boundary_sample_sides, render_antialiased, render_uniform_supersampled,
+                                DISTANCE_ENGINES)
+
+VIEW = (48, 40, -2.0, 1.0, -1.5, 1.5, 60)
+
+def test_boundary_sample_sides():
+    distances = np.array([[-1.0, -1.0, 0.05, 5.0],
+                          [-1.0, -1.0, 0.5, 5.0]])
+    sides = boundary_sample_sides(distances, pixel_size=1.0, threshold=1.0, max_samples_per_side=4)
+    # Deep interior and far exterior pixels keep one sample
+    assert sides[0, 0] == 1 and sides[0, 3] == 1
+    # Interior pixels next to the exterior get the most samples
+    assert sides[0, 1] == 4 and sides[1, 1] == 4
+    # Closer exterior pixels get more samples
+    assert sides[0, 2] == 4 and sides[1, 2] == 2
+
+@pytest.mark.parametrize("engine", DISTANCE_ENGINES)
+def test_adaptive_close_to_uniform(engine):
+    pytest.importorskip("pyopencl" if engine == "opencl" else engine)
+    image, extra_samples = render_antialiased(*VIEW, engine=engine, max_samples_per_side=4)
+    uniform = render_uniform_supersampled(*VIEW, 4, engine=engine)
+    single = render_uniform_supersampled(*VIEW, 1, engine=engine)
+    assert image.shape == (40, 48)
+    assert 0 < extra_samples < 15 * 48 * 40
+    assert np.abs(image - uniform).mean() < np.abs(single - uniform).mean()
+
+def test_engines_agree():
+    pytest.importorskip("pyopencl")
+    numba_image, numba_extra = render_antialiased(*VIEW, engine="numba")
+    opencl_image, opencl_extra = render_antialiased(*VIEW, engine="opencl")
+    np.testing.assert_allclose(numba_image, opencl_image, atol=1e-9)
+    assert numba_extra == opencl_extra
+
+if __name__ == "__main__":
+    pytest.main()
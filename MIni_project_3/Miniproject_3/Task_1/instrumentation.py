@@ -0,0 +1,192 @@
+import json
+import numpy as np
+
+class WorkerMetrics:
+
+    """
+        Buffer of measurements taken by one worker (a process or a thread).
+
+        A worker fills its own buffer without any locking; the buffers are combined by
+        Instrumentation once the render is over.
+
+        Parameters:
+            worker (str): The name of the worker, for instance its pid or thread name.
+            max_iterations (int): The iteration limit of the render, which sizes the histogram.
+    """
+
+    def __init__(self, worker, max_iterations):
+        self.worker = str(worker)
+        self.tile_seconds = []
+        self.iterations = 0
+        self.pixels = 0
+        self.interior = 0
+        self.bytes_moved = 0
+        self.histogram = np.zeros(max_iterations + 1, dtype=np.int64)
+
+    def record_tile(self, seconds, counts, max_iterations, bytes_moved=0):
+
+        """
+            Record one finished tile.
+
+            Parameters:
+                seconds (float): The wall time spent computing the tile.
+                counts (numpy.ndarray): The escape counts of the tile.
+                max_iterations (int): The iteration limit; a count equal to it is an interior point.
+                bytes_moved (int): The bytes copied between processes for this tile.
+        """
+
+        counts = np.asarray(counts).ravel()
+        histogram = np.bincount(counts, minlength=max_iterations + 1)
+        self.tile_seconds.append(seconds)
+        self.iterations += int(counts.sum())
+        self.pixels += counts.size
+        self.interior += int(histogram[max_iterations])
+        self.bytes_moved += bytes_moved
+        self.histogram += histogram[:max_iterations + 1]
+
+class Instrumentation:
+
+    """
+        Collects the per-worker buffers of one or more renders and exports their merged totals.
+
+        Pass an instance as the 'metrics' argument of an instrumented engine. Engines only take
+        measurements when one is given, so rendering without it costs nothing extra.
+    """
+
+    def __init__(self):
+        self.buffers = []
+        self.wall_seconds = 0.0
+
+    def add(self, buffer):
+        self.buffers.append(buffer)
+
+    def summary(self):
+
+        """
+            Merge the worker buffers.
+
+            Returns:
+                dict: 'tiles', 'wall_seconds', 'tile_seconds' (total, mean, p50, p99 and max),
+                    'workers' (tiles, busy_seconds and utilization of every worker), 'iterations',
+                    'pixels', 'interior_fraction', 'bytes_moved' and 'histogram', the number of
+                    pixels per escape count.
+        """
+
+        tile_seconds = np.array([s for buffer in self.buffers for s in buffer.tile_seconds])
+        size = max((len(buffer.histogram) for buffer in self.buffers), default=1)
+        histogram = np.zeros(size, dtype=np.int64)
+        workers = {}
+        for buffer in self.buffers:
+            histogram[:len(buffer.histogram)] += buffer.histogram
+            worker = workers.setdefault(buffer.worker, {"tiles": 0, "busy_seconds": 0.0})
+            worker["tiles"] += len(buffer.tile_seconds)
+            worker["busy_seconds"] += sum(buffer.tile_seconds)
+        for worker in workers.values():
+            worker["utilization"] = worker["busy_seconds"] / self.wall_seconds if self.wall_seconds else 0.0
+
+        pixels = sum(buffer.pixels for buffer in self.buffers)
+        if len(tile_seconds):
+            p50, p99 = np.percentile(tile_seconds, [50, 99])
+            tiles = {"total": float(tile_seconds.sum()), "mean": float(tile_seconds.mean()),
+                     "p50": float(p50), "p99": float(p99), "max": float(tile_seconds.max())}
+        else:
+            tiles = {"total": 0.0, "mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "tiles": len(tile_seconds),
+            "wall_seconds": self.wall_seconds,
+            "tile_seconds": tiles,
+            "workers": workers,
+            "iterations": sum(buffer.iterations for buffer in self.buffers),
+            "pixels": pixels,
+            "interior_fraction": sum(buffer.interior for buffer in self.buffers) / pixels if pixels else 0.0,
+            "bytes_moved": sum(buffer.bytes_moved for buffer in self.buffers),
+            "histogram": histogram.tolist(),
+        }
+
+    def to_json(self, indent=None):
+
+        """
+            Return the summary as a JSON document.
+        """
+
+        return json.dumps(self.summary(), indent=indent)
+
+    def to_prometheus(self, prefix="mandelbrot"):
+
+        """
+            Return the summary in the Prometheus text exposition format.
+
+            The escape-count histogram is exported with power-of-two bucket bounds, so its size
+            stays small for large iteration limits; the JSON export keeps every count. Pixels that
+            reached the iteration limit are only counted in interior_fraction.
+        """
+
+        summary = self.summary()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else ""
+                lines.append(f"{prefix}_{name}{suffix}{label_text} {value}")
+
+        tiles = summary["tile_seconds"]
+        metric("tile_seconds", "summary", "Wall time spent computing one tile.",
+               [("", {"quantile": "0.5"}, tiles["p50"]), ("", {"quantile": "0.99"}, tiles["p99"]),
+                ("_sum", {}, tiles["total"]), ("_count", {}, summary["tiles"])])
+        metric("worker_utilization", "gauge", "Fraction of the wall time a worker spent computing tiles.",
+               [("", {"worker": name}, worker["utilization"]) for name, worker in sorted(summary["workers"].items())])
+        metric("iterations_total", "counter", "Escape-time iterations executed.", [("", {}, summary["iterations"])])
+        metric("pixels_total", "counter", "Pixels computed.", [("", {}, summary["pixels"])])
+        metric("interior_fraction", "gauge", "Fraction of the pixels that never escaped.",
+               [("", {}, summary["interior_fraction"])])
+        metric("bytes_moved_total", "counter", "Bytes copied between processes.", [("", {}, summary["bytes_moved"])])
+
+        # Interior pixels never escaped, so they are left out of the histogram and its sum and count
+        size = max((len(buffer.histogram) for buffer in self.buffers), default=1)
+        escaped = np.zeros(size - 1, dtype=np.int64)
+        for buffer in self.buffers:
+            escaped[:len(buffer.histogram) - 1] += buffer.histogram[:-1]
+        cumulative = np.cumsum(escaped)
+        total = int(cumulative[-1]) if len(cumulative) else 0
+        buckets = []
+        bound = 1
+        while bound < len(escaped):
+            buckets.append(("_bucket", {"le": bound}, int(cumulative[bound])))
+            bound *= 2
+        buckets.append(("_bucket", {"le": "+Inf"}, total))
+        buckets.append(("_sum", {}, int(np.dot(np.arange(len(escaped)), escaped))))
+        buckets.append(("_count", {}, total))
+        metric("escape_iterations", "histogram", "Iterations before a pixel escaped, for the pixels that escaped.", buckets)
+        return "\n".join(lines) + "\n"
+
+def main():
+
+    """
+        Render one frame with the instrumented thread-pool and process-pool engines and print
+        the merged metrics of each.
+    """
+
+    from multiprocess_approach import generate_mandelbrot_parallel
+    from render_engines import ThreadPoolEngine
+
+    width, height = 400, 400
+    x_min, x_max = -2.0, 1.0
+    y_min, y_max = -1.5, 1.5
+    max_iterations = 100
+
+    engine = ThreadPoolEngine()
+    engine.metrics = Instrumentation()
+    engine.compute(width, height, x_min, x_max, y_min, y_max, max_iterations)
+    print(engine.metrics.to_prometheus())
+    engine.executor.shutdown()
+
+    metrics = Instrumentation()
+    generate_mandelbrot_parallel(width, height, x_min, x_max, y_min, y_max, max_iterations, metrics=metrics)
+    summary = metrics.summary()
+    del summary["histogram"]
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import json
+import numpy as np
+import pytest
+from instrumentation import Instrumentation, WorkerMetrics
+from multiprocess_approach import generate_mandelbrot_parallel
+from render_engines import ThreadPoolEngine
+
+VIEW = (-2.0, 1.0, -1.5, 1.5)
+
+def test_buffers_merge_per_worker():
+    metrics = Instrumentation()
+    metrics.wall_seconds = 2.0
+    for worker, counts in (("a", [[0, 1], [5, 5]]), ("b", [[2, 5]]), ("a", [[1, 1]])):
+        buffer = WorkerMetrics(worker, 5)
+        buffer.record_tile(0.5, np.array(counts), 5, bytes_moved=10)
+        metrics.add(buffer)
+
+    summary = metrics.summary()
+    assert summary["tiles"] == 3
+    assert summary["workers"]["a"] == {"tiles": 2, "busy_seconds": 1.0, "utilization": 0.5}
+    assert summary["histogram"] == [1, 3, 1, 0, 0, 3]
+    assert summary["iterations"] == 0 + 1 + 5 + 5 + 2 + 5 + 1 + 1
+    assert summary["interior_fraction"] == 3 / 8
+    assert summary["bytes_moved"] == 30
+    assert json.loads(metrics.to_json())["pixels"] == 8
+
+def test_prometheus_export():
+    metrics = Instrumentation()
+    buffer = WorkerMetrics(7, 8)
+    buffer.record_tile(0.25, np.array([0, 3, 8, 8]), 8)
+    metrics.add(buffer)
+    text = metrics.to_prometheus()
+    assert "# TYPE mandelbrot_escape_iterations histogram" in text
+    assert 'mandelbrot_escape_iterations_bucket{le="4"} 2' in text
+    assert 'mandelbrot_escape_iterations_bucket{le="+Inf"} 2' in text
+    assert "mandelbrot_escape_iterations_sum 3" in text
+    assert "mandelbrot_escape_iterations_count 2" in text
+    assert 'mandelbrot_worker_utilization{worker="7"} 0.0' in text
+    assert "mandelbrot_interior_fraction 0.5" in text
+
+def test_thread_engine_metrics():
+    engine = ThreadPoolEngine(max_workers=2, tile_rows=4)
+    engine.metrics = Instrumentation()
+    engine.symmetric = False
+    counts, _ = engine.compute(30, 20, *VIEW, 50)
+    summary = engine.metrics.summary()
+    assert summary["tiles"] == 5
+    assert summary["pixels"] == 600
+    assert summary["iterations"] == counts.sum()
+    assert summary["bytes_moved"] == 0
+    assert summary["histogram"] == np.bincount(counts.ravel(), minlength=51).tolist()
+    engine.executor.shutdown()
+
+def test_process_pool_metrics(capfd):
+    metrics = Instrumentation()
+    image = generate_mandelbrot_parallel(12, 9, *VIEW, 40, metrics=metrics)
+    summary = metrics.summary()
+    assert summary["tiles"] == 9 - 4
+    assert summary["bytes_moved"] > image[:5].nbytes
+    assert summary["iterations"] == image[:5].sum()
+    assert "Computed Row" not in capfd.readouterr().out
+
+if __name__ == "__main__":
+    pytest.main()
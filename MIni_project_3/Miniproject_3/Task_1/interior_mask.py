@@ -0,0 +1,245 @@
+import time
+import numpy as np
+from numba import njit
+import numba_render_kernels
+from numba_approach import mandelbrot
+from render_engines import axis_coordinates
+
+@njit
+def label_regions(mask):
+
+    """
+        Label the 4-connected regions of True cells of a boolean array.
+
+        Returns:
+            tuple: (labels, sizes). 'labels' is an int32 array with 0 outside the regions and
+                k + 1 in region k; sizes[k] is the number of cells of region k.
+    """
+
+    height, width = mask.shape
+    labels = np.zeros((height, width), dtype=np.int32)
+    sizes = np.zeros(height * width, dtype=np.int64)
+    stack = np.empty(height * width, dtype=np.int64)
+    regions = 0
+    for start_i in range(height):
+        for start_j in range(width):
+            if not mask[start_i, start_j] or labels[start_i, start_j]:
+                continue
+            regions += 1
+            labels[start_i, start_j] = regions
+            stack[0] = start_i * width + start_j
+            top = 1
+            while top:
+                top -= 1
+                i = stack[top] // width
+                j = stack[top] % width
+                sizes[regions - 1] += 1
+                for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                    ni = i + di
+                    nj = j + dj
+                    if 0 <= ni < height and 0 <= nj < width and mask[ni, nj] and not labels[ni, nj]:
+                        labels[ni, nj] = regions
+                        stack[top] = ni * width + nj
+                        top += 1
+    return labels, sizes[:regions].copy()
+
+def erode(mask, margin):
+
+    """
+        Shrink the True regions of 'mask' by 'margin' cells in every direction, including the
+        diagonals. Cells on the edge of the array are dropped, as nothing is known beyond it.
+    """
+
+    mask = mask.copy()
+    for _ in range(margin):
+        vertical = mask.copy()
+        vertical[1:] &= mask[:-1]
+        vertical[:-1] &= mask[1:]
+        vertical[[0, -1]] = False
+        mask = vertical.copy()
+        mask[:, 1:] &= vertical[:, :-1]
+        mask[:, :-1] &= vertical[:, 1:]
+        mask[:, [0, -1]] = False
+    return mask
+
+def grow(mask):
+
+    """
+        Grow the True regions of 'mask' by one cell in every direction, including the diagonals.
+    """
+
+    vertical = mask.copy()
+    vertical[1:] |= mask[:-1]
+    vertical[:-1] |= mask[1:]
+    grown = vertical.copy()
+    grown[:, 1:] |= vertical[:, :-1]
+    grown[:, :-1] |= vertical[:, 1:]
+    return grown
+
+def low_resolution_mask(real, imag, max_iterations, factor=8, margin=2, min_region=16):
+
+    """
+        Find the low-resolution cells that can safely be treated as interior.
+
+        Every 'factor'-th pixel is computed. The cells that never escape are grouped into
+        connected regions, regions of fewer than 'min_region' cells are dropped as unreliable,
+        and the rest are eroded by 'margin' cells, so a skipped pixel is always surrounded by
+        computed interior samples.
+
+        Sampling every 'factor'-th pixel can still miss a thin escaping filament, so a ring of
+        full-resolution pixels around the edge of the safe cells is computed as well: the pixels
+        just outside and those up to factor // 2 pixels inside. Cells next to an escaping ring
+        pixel are dropped and the new ring is computed, until the whole ring stays inside. The set
+        has no holes, so a filament can only reach the skipped pixels by crossing the ring.
+
+        Parameters:
+            real (numpy.ndarray): The real coordinate of every column of the full-resolution image.
+            imag (numpy.ndarray): The imaginary coordinate of every row of the full-resolution image.
+            max_iterations (int): The maximum number of iterations for each complex number.
+            factor (int): The number of pixels per low-resolution cell along each axis.
+            margin (int): The number of cells removed around every region.
+            min_region (int): The smallest region, in cells, that is kept.
+
+        Returns:
+            tuple: (safe, regions), the boolean array of safe cells and the number of safe regions.
+    """
+
+    low_real = np.ascontiguousarray(real[::factor])
+    low_imag = np.ascontiguousarray(imag[::factor])
+    counts = np.empty((len(low_imag), len(low_real)), dtype=np.int32)
+    modulus_sq = np.empty(counts.shape, dtype=np.float64)
+    numba_render_kernels.escape_time_grid(low_real, low_imag, max_iterations, counts, modulus_sq)
+
+    labels, sizes = label_regions(counts == max_iterations)
+    keep = np.concatenate(([False], sizes >= min_region))
+    safe = erode(keep[labels], margin)
+
+    rows = _cell_index(len(imag), factor, safe.shape[0])
+    columns = _cell_index(len(real), factor, safe.shape[1])
+    while True:
+        skipped = safe[rows][:, columns]
+        near_ring = ~skipped
+        for _ in range(factor // 2):
+            near_ring = grow(near_ring)
+        ring_rows, ring_columns = np.nonzero(grow(skipped) & near_ring)
+        ring_counts = np.empty(len(ring_rows), dtype=np.int32)
+        numba_render_kernels.escape_time_points(real, imag, ring_rows, ring_columns, max_iterations, ring_counts)
+        escaping = np.zeros(skipped.shape, dtype=bool)
+        escaping[ring_rows[ring_counts < max_iterations], ring_columns[ring_counts < max_iterations]] = True
+        # A skipped pixel on the edge of the image has no ring on that side
+        escaping[[0, -1]] = True
+        escaping[:, [0, -1]] = True
+        leaking = grow(escaping) & skipped
+        if not leaking.any():
+            break
+        leaking_rows, leaking_columns = np.nonzero(leaking)
+        safe[rows[leaking_rows], columns[leaking_columns]] = False
+    return safe, len(label_regions(safe)[1])
+
+def _cell_index(n, factor, cells):
+    return np.minimum((np.arange(n) + factor // 2) // factor, cells - 1)
+
+def render_with_mask(width, height, xmin, xmax, ymin, ymax, max_iterations, factor=8, margin=2, min_region=16,
+                     verify=0, seed=0):
+
+    """
+        Render escape counts, marking the pixels inside safe low-resolution regions as interior
+        without iterating them.
+
+        Parameters:
+            width (int): The width of the image (number of pixels).
+            height (int): The height of the image (number of pixels).
+            xmin (float): The minimum value of the real part of the complex plane.
+            xmax (float): The maximum value of the real part of the complex plane.
+            ymin (float): The minimum value of the imaginary part of the complex plane.
+            ymax (float): The maximum value of the imaginary part of the complex plane.
+            max_iterations (int): The maximum number of iterations to perform.
+            factor, margin, min_region: See low_resolution_mask.
+            verify (int): The number of skipped pixels to recompute with numba_approach.mandelbrot.
+            seed (int): The seed used to pick the pixels to verify.
+
+        Returns:
+            tuple: (counts, stats). 'counts' is an int32 array of shape (height, width). 'stats'
+                holds 'skipped', 'skipped_fraction', 'regions', 'mask_seconds', 'render_seconds',
+                and, when verifying, 'checked', 'mismatches' and 'mismatch_rate'.
+    """
+
+    real = axis_coordinates(width, xmin, xmax)
+    imag = axis_coordinates(height, ymin, ymax)
+
+    start_time = time.perf_counter()
+    safe, regions = low_resolution_mask(real, imag, max_iterations, factor, margin, min_region)
+    mask_time = time.perf_counter()
+    counts = np.empty((height, width), dtype=np.int32)
+    numba_render_kernels.escape_time_skip(real, imag, max_iterations, safe, factor, counts)
+    end_time = time.perf_counter()
+
+    # Pixels per cell along each axis, so the number of skipped pixels is rows @ safe @ columns
+    rows = np.bincount(_cell_index(height, factor, safe.shape[0]), minlength=safe.shape[0])
+    columns = np.bincount(_cell_index(width, factor, safe.shape[1]), minlength=safe.shape[1])
+    skipped = int(rows @ safe.astype(np.int64) @ columns)
+    stats = {
+        "skipped": skipped,
+        "skipped_fraction": skipped / (width * height),
+        "regions": regions,
+        "mask_seconds": mask_time - start_time,
+        "render_seconds": end_time - mask_time,
+    }
+
+    if verify:
+        cell_rows, cell_columns = np.nonzero(safe)
+        if len(cell_rows):
+            rng = np.random.default_rng(seed)
+            picks = rng.integers(len(cell_rows), size=verify)
+            offsets = rng.integers(0, factor, size=(verify, 2)) - factor // 2
+            i = np.clip(cell_rows[picks] * factor + offsets[:, 0], 0, height - 1)
+            j = np.clip(cell_columns[picks] * factor + offsets[:, 1], 0, width - 1)
+            # Keep only pixels that really were skipped; clipping can move a pick out of its cell
+            skipped_pixels = safe[_cell_index(height, factor, safe.shape[0])[i], _cell_index(width, factor, safe.shape[1])[j]]
+            i, j = i[skipped_pixels], j[skipped_pixels]
+            mismatches = sum(mandelbrot(complex(real[b], imag[a]), max_iterations) != max_iterations
+                             for a, b in zip(i, j))
+        else:
+            mismatches, i = 0, []
+        stats.update(checked=len(i), mismatches=int(mismatches),
+                     mismatch_rate=mismatches / len(i) if len(i) else 0.0)
+    return counts, stats
+
+def main():
+
+    """
+        Report the pixels skipped, the speedup and the verified mismatch rate for the default
+        viewport and a few zooms onto the boundary.
+    """
+
+    width, height = 2000, 2000
+    max_iterations = 2000
+    views = {
+        "default": (-2.0, 1.0, -1.5, 1.5),
+        "period-3 bulb": (-0.2, 0.0, 0.65, 0.85),
+        "minibrot at -1.75": (-1.80, -1.70, -0.05, 0.05),
+        "seahorse valley": (-0.80, -0.70, 0.05, 0.15),
+    }
+
+    real = axis_coordinates(8, -2.0, 1.0)
+    numba_render_kernels.escape_time_skip(real, real, 1, np.zeros((1, 1), dtype=bool), 1, np.empty((8, 8), dtype=np.int32))
+    render_with_mask(16, 16, -2.0, 1.0, -1.5, 1.5, 10)
+
+    for name, view in views.items():
+        real = axis_coordinates(width, view[0], view[1])
+        imag = axis_coordinates(height, view[2], view[3])
+        full = np.empty((height, width), dtype=np.int32)
+        start_time = time.perf_counter()
+        numba_render_kernels.escape_time_skip(real, imag, max_iterations, np.zeros((1, 1), dtype=bool), 1, full)
+        full_seconds = time.perf_counter() - start_time
+
+        counts, stats = render_with_mask(width, height, *view, max_iterations, verify=2000)
+        masked_seconds = stats["mask_seconds"] + stats["render_seconds"]
+        differing = np.count_nonzero(counts != full)
+        print(f"{name}: skipped {stats['skipped_fraction']:.1%} of the pixels in {stats['regions']} regions, "
+              f"{full_seconds:.2f} -> {masked_seconds:.2f} seconds ({full_seconds / masked_seconds:.2f}x), "
+              f"verified mismatch rate {stats['mismatch_rate']:.2%} of {stats['checked']}, "
+              f"{differing} pixels differ from the full render")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from interior_mask import label_regions, erode, render_with_mask
+from render_engines import get_engine
+
+def test_label_regions():
+    mask = np.array([[1, 1, 0, 0],
+                     [0, 1, 0, 1],
+                     [0, 0, 0, 1],
+                     [1, 0, 0, 0]], dtype=bool)
+    labels, sizes = label_regions(mask)
+    assert sizes.tolist() == [3, 2, 1]
+    assert labels[0, 0] == labels[1, 1] != labels[1, 3]
+    assert label_regions(np.zeros((3, 3), dtype=bool))[1].size == 0
+
+def test_erode_includes_diagonals_and_edges():
+    mask = np.ones((7, 7), dtype=bool)
+    mask[3, 3] = False
+    eroded = erode(mask, 1)
+    assert not eroded[0].any() and not eroded[:, -1].any()
+    assert not eroded[2:5, 2:5].any()
+    assert eroded[1, 1] and eroded[5, 5]
+
+def test_computed_pixels_match_full_render():
+    view = (-1.0, 0.4, -0.7, 0.7)
+    counts, stats = render_with_mask(160, 120, *view, 200, factor=4, margin=2, min_region=4, verify=300)
+    full, _ = get_engine("numba").compute(160, 120, *view, 200)
+    differing = counts != full
+    assert stats["skipped"] > 0.3 * counts.size
+    assert not differing.any()
+    assert stats["checked"] > 0
+    assert stats["mismatches"] == 0
+
+def test_view_without_interior_skips_nothing():
+    counts, stats = render_with_mask(64, 64, 0.5, 1.0, 0.5, 1.0, 100, verify=10)
+    full, _ = get_engine("numba").compute(64, 64, 0.5, 1.0, 0.5, 1.0, 100)
+    np.testing.assert_array_equal(counts, full)
+    assert stats["skipped"] == stats["regions"] == stats["checked"] == 0
+
+if __name__ == "__main__":
+    pytest.main()
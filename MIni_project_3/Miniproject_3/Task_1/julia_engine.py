@@ -0,0 +1,147 @@
+import time
+import numpy as np
+from render_engines import axis_coordinates, get_engine
+
+JULIA_ENGINES = ("numpy", "numba", "opencl")
+
+BATCH_BYTES = 64 * 2**20
+
+def _julia_numpy(c_values, real, imag, max_iterations, counts):
+    z = (real[np.newaxis, np.newaxis, :] + 1j * imag[np.newaxis, :, np.newaxis]) * np.ones((len(c_values), 1, 1))
+    c = np.broadcast_to(c_values[:, np.newaxis, np.newaxis], z.shape).ravel()
+    z = z.ravel()
+    flat = counts.reshape(-1)
+    flat[:] = max_iterations
+    active = np.arange(z.size)
+
+    for n in range(max_iterations):
+        escaped = z.real * z.real + z.imag * z.imag > 4.0
+        if escaped.any():
+            flat[active[escaped]] = n
+            keep = ~escaped
+            z, c, active = z[keep], c[keep], active[keep]
+            if active.size == 0:
+                break
+        z = z * z + c
+
+def _julia_numba(c_values, real, imag, max_iterations, counts):
+    get_engine("numba")
+    import numba_render_kernels
+    numba_render_kernels.julia_batch(c_values, real, imag, max_iterations, counts)
+
+def _julia_opencl(c_values, real, imag, max_iterations, counts):
+    engine = get_engine("opencl")
+    cl = engine.cl
+    mf = cl.mem_flags
+    kernel = engine.get_kernel("julia_opencl.cl", "calculate_julia")
+
+    real_buf = cl.Buffer(engine.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=real)
+    imag_buf = cl.Buffer(engine.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=imag)
+    c_buf = cl.Buffer(engine.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=np.ascontiguousarray(c_values))
+    counts_buf = cl.Buffer(engine.context, mf.WRITE_ONLY, counts.nbytes)
+
+    kernel(engine.queue, (len(real), len(imag), len(c_values)), None, counts_buf, real_buf, imag_buf, c_buf,
+           np.int32(len(real)), np.int32(len(imag)), np.int32(max_iterations))
+    cl.enqueue_copy(engine.queue, counts, counts_buf)
+
+_JULIA_KERNELS = {
+    "numpy": _julia_numpy,
+    "numba": _julia_numba,
+    "opencl": _julia_opencl,
+}
+
+def generate_julia_batch(c_values, width, height, xmin, xmax, ymin, ymax, max_iterations, engine="numba", out=None,
+                         batch_size=None):
+
+    """
+        Compute the Julia sets of many parameters 'c' in batched passes.
+
+        For every c the starting point z0 is taken from the pixel and z -> z^2 + c is iterated;
+        all images of a batch are computed by one vectorized (numpy), parallel (numba) or
+        3-D NDRange (OpenCL) call instead of one call per image.
+
+        Parameters:
+            c_values (array_like): The complex parameters, one image per value.
+            width (int): The width of each image (number of columns).
+            height (int): The height of each image (number of rows).
+            xmin (float): The minimum value of the real part of z0.
+            xmax (float): The maximum value of the real part of z0.
+            ymin (float): The minimum value of the imaginary part of z0.
+            ymax (float): The maximum value of the imaginary part of z0.
+            max_iterations (int): The maximum number of iterations for each starting point.
+            engine (str): One of JULIA_ENGINES.
+            out (numpy.ndarray or str): An int32 array of shape (len(c_values), height, width) to fill,
+                or the name of a .npy file to create as a memmap. A new array is allocated when None.
+            batch_size (int): The number of images computed per call. By default all images go in
+                one call when writing to memory, and batches of about BATCH_BYTES go to a memmap.
+
+        Returns:
+            numpy.ndarray: The int32 escape counts of shape (len(c_values), height, width).
+    """
+
+    if engine not in _JULIA_KERNELS:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {JULIA_ENGINES}")
+
+    c_values = np.asarray(c_values, dtype=np.complex128).ravel()
+    shape = (len(c_values), height, width)
+    if out is None:
+        out = np.empty(shape, dtype=np.int32)
+    elif isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode="w+", dtype=np.int32, shape=shape)
+    elif out.shape != shape or out.dtype != np.int32:
+        raise ValueError(f"'out' must be an int32 array of shape {shape}")
+
+    direct = type(out) is np.ndarray and out.flags.c_contiguous
+    if batch_size is None:
+        batch_size = len(c_values) if direct else max(1, BATCH_BYTES // (height * width * 4))
+
+    real = axis_coordinates(width, xmin, xmax)
+    imag = axis_coordinates(height, ymin, ymax)
+    kernel = _JULIA_KERNELS[engine]
+    for start in range(0, len(c_values), batch_size):
+        stop = min(start + batch_size, len(c_values))
+        if direct:
+            kernel(c_values[start:stop], real, imag, max_iterations, out[start:stop])
+        else:
+            block = np.empty((stop - start, height, width), dtype=np.int32)
+            kernel(c_values[start:stop], real, imag, max_iterations, block)
+            out[start:stop] = block
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+def main():
+
+    """
+        Benchmark one batched call against a loop of single-image calls for each engine.
+    """
+
+    width, height = 400, 400
+    x_min, x_max = -1.5, 1.5
+    y_min, y_max = -1.5, 1.5
+    max_iterations = 200
+    c_values = 0.7885 * np.exp(1j * np.linspace(0, 2 * np.pi, 32, endpoint=False))
+
+    for engine in JULIA_ENGINES:
+        try:
+            generate_julia_batch(c_values[:1], 8, 8, x_min, x_max, y_min, y_max, 1, engine=engine)
+        except Exception as e:
+            print(f"Skipping {engine}: {e}")
+            continue
+
+        start_time = time.time()
+        generate_julia_batch(c_values, width, height, x_min, x_max, y_min, y_max, max_iterations, engine=engine)
+        batch_time = time.time() - start_time
+
+        start_time = time.time()
+        for c in c_values:
+            generate_julia_batch([c], width, height, x_min, x_max, y_min, y_max, max_iterations, engine=engine)
+        loop_time = time.time() - start_time
+
+        pixels = len(c_values) * width * height
+        print(f"{engine}: batched {pixels / batch_time / 1e6:.2f} Mpixels/s, "
+              f"looped {pixels / loop_time / 1e6:.2f} Mpixels/s ({loop_time / batch_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
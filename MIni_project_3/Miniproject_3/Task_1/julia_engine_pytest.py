@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from julia_engine import generate_julia_batch, JULIA_ENGINES
+
+C_VALUES = [complex(-0.8, 0.156), complex(0.285, 0.01), complex(-0.4, 0.6)]
+
+def julia(z, c, max_iterations):
+    for n in range(max_iterations):
+        if z.real * z.real + z.imag * z.imag > 4:
+            return n
+        z = z*z + c
+    return max_iterations
+
+def test_generate_julia_batch_numpy():
+    counts = generate_julia_batch(C_VALUES, 6, 4, -1.5, 1.5, -1.0, 1.0, 50, engine="numpy")
+    assert counts.shape == (3, 4, 6) and counts.dtype == np.int32
+    real = np.linspace(-1.5, 1.5, 6)
+    imag = np.linspace(-1.0, 1.0, 4)
+    for k, c in enumerate(C_VALUES):
+        expected = [[julia(complex(r, i), c, 50) for r in real] for i in imag]
+        np.testing.assert_array_equal(counts[k], expected)
+
+@pytest.mark.parametrize("engine", JULIA_ENGINES[1:])
+def test_engines_match_numpy(engine):
+    pytest.importorskip("pyopencl" if engine == "opencl" else engine)
+    args = (C_VALUES, 30, 20, -1.5, 1.5, -1.0, 1.0, 100)
+    expected = generate_julia_batch(*args, engine="numpy")
+    np.testing.assert_array_equal(generate_julia_batch(*args, engine=engine), expected)
+
+def test_memmap_output_in_batches(tmp_path):
+    path = str(tmp_path / "julia.npy")
+    counts = generate_julia_batch(C_VALUES, 10, 8, -1.5, 1.5, -1.0, 1.0, 40, engine="numpy", out=path, batch_size=2)
+    expected = generate_julia_batch(C_VALUES, 10, 8, -1.5, 1.5, -1.0, 1.0, 40, engine="numpy")
+    np.testing.assert_array_equal(np.load(path), expected)
+    assert isinstance(counts, np.memmap)
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,165 @@
+import time
+import numpy as np
+from render_engines import EscapeTimeEngine, get_engine
+
+VARIANTS = ("standard", "burning_ship", "tricorn")
+
+EXPONENTS = range(2, 9)
+
+_numba_kernels = {}
+
+def _build_numba_kernel(exponent, escape_radius_sq, variant):
+    from numba import njit, prange
+
+    # 'exponent', 'escape_radius_sq' and 'variant' are frozen as constants when the closure is
+    # compiled, so the power loop is unrolled and the branches of the other variants disappear.
+    @njit(parallel=True, nogil=True)
+    def kernel(real, imag, max_iterations, counts, modulus_sq):
+        for i in prange(imag.shape[0]):
+            c_imag = imag[i]
+            for j in range(real.shape[0]):
+                c_real = real[j]
+                x = 0.0
+                y = 0.0
+                n = 0
+                while n < max_iterations and x * x + y * y <= escape_radius_sq:
+                    if variant == 1:
+                        x = abs(x)
+                        y = abs(y)
+                    elif variant == 2:
+                        y = -y
+                    zr = x
+                    zi = y
+                    for _ in range(exponent - 1):
+                        zr, zi = zr * x - zi * y, zr * y + zi * x
+                    x = zr + c_real
+                    y = zi + c_imag
+                    n += 1
+                counts[i, j] = n
+                modulus_sq[i, j] = x * x + y * y
+
+    return kernel
+
+def get_numba_kernel(exponent, escape_radius, variant):
+
+    """
+        Return the Numba kernel specialized for one exponent, escape radius and variant.
+
+        Each combination is compiled once, on first use, and then kept for the rest of the
+        process. The kernel has the signature of numba_render_kernels.escape_time_grid.
+
+        Parameters:
+            exponent (int): The power 'd' in z^d + c, from 2 to 8.
+            escape_radius (float): The bailout radius; a point escapes once |z|^2 > escape_radius^2.
+            variant (str): One of VARIANTS.
+
+        Returns:
+            function: The compiled kernel.
+    """
+
+    key = _signature(exponent, escape_radius, variant)
+    if key not in _numba_kernels:
+        kernel = _build_numba_kernel(*key)
+        axis = np.zeros(2, dtype=np.float64)
+        kernel(axis, axis, 1, np.zeros((2, 2), dtype=np.int32), np.zeros((2, 2), dtype=np.float64))
+        _numba_kernels[key] = kernel
+    return _numba_kernels[key]
+
+def opencl_build_options(exponent, escape_radius, variant):
+
+    """
+        Return the OpenCL build options that specialize Task_2/multibrot.cl for one combination.
+    """
+
+    exponent, escape_radius_sq, variant = _signature(exponent, escape_radius, variant)
+    return (f"-DEXPONENT={exponent}", f"-DESCAPE_RADIUS_SQ={escape_radius_sq!r}", f"-DVARIANT={variant}")
+
+def _signature(exponent, escape_radius, variant):
+    if exponent not in EXPONENTS:
+        raise ValueError(f"'exponent' must be an integer from {EXPONENTS.start} to {EXPONENTS.stop - 1}, got {exponent!r}")
+    if not escape_radius > 0:
+        raise ValueError(f"'escape_radius' must be positive, got {escape_radius!r}")
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown variant '{variant}', expected one of {VARIANTS}")
+    return int(exponent), float(escape_radius) ** 2, VARIANTS.index(variant)
+
+class MultibrotEngine(EscapeTimeEngine):
+
+    """
+        Escape-time engine for z^d + c and its burning ship and tricorn variants.
+
+        The kernel is specialized for the exponent, escape radius and variant given here and
+        cached, so engines with the same parameters share one compiled kernel or program. The
+        standard engines are untouched, so the d = 2 renders cost exactly what they did before.
+
+        The burning ship is not symmetric about the real axis, so mirroring is turned off for it.
+
+        Parameters:
+            exponent (int): The power 'd' in z^d + c, from 2 to 8.
+            escape_radius (float): The bailout radius.
+            variant (str): One of VARIANTS.
+            backend (str): "numba" or "opencl".
+    """
+
+    def __init__(self, exponent=2, escape_radius=2.0, variant="standard", backend="numba"):
+        self.exponent = exponent
+        self.escape_radius = escape_radius
+        self.variant = variant
+        self.backend = backend
+        self.name = f"multibrot-{backend}"
+        self.symmetric = variant != "burning_ship"
+        if backend == "numba":
+            self._kernel = get_numba_kernel(exponent, escape_radius, variant)
+        elif backend == "opencl":
+            self._opencl = get_engine("opencl")
+            self._kernel = self._opencl.get_kernel("multibrot.cl", "calculate_multibrot",
+                                                   opencl_build_options(exponent, escape_radius, variant))
+        else:
+            raise ValueError(f"Unknown backend '{backend}', expected 'numba' or 'opencl'")
+
+    def compute_rows(self, real, imag, max_iterations, counts, modulus_sq):
+        if self.backend == "numba":
+            self._kernel(real, imag, max_iterations, counts, modulus_sq)
+            return
+        engine = self._opencl
+        cl = engine.cl
+        mf = cl.mem_flags
+        real_buf = cl.Buffer(engine.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=real)
+        imag_buf = cl.Buffer(engine.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=np.ascontiguousarray(imag))
+        counts_buf = cl.Buffer(engine.context, mf.WRITE_ONLY, counts.nbytes)
+        modulus_buf = cl.Buffer(engine.context, mf.WRITE_ONLY, modulus_sq.nbytes)
+
+        self._kernel(engine.queue, (len(real), len(imag)), None, counts_buf, modulus_buf, real_buf, imag_buf,
+                     np.int32(len(real)), np.int32(max_iterations))
+        cl.enqueue_copy(engine.queue, counts, counts_buf)
+        cl.enqueue_copy(engine.queue, modulus_sq, modulus_buf)
+
+def main():
+
+    """
+        Time the generic kernel against the standard one for d = 2 and report the cost of the
+        higher exponents and the variants.
+    """
+
+    width, height = 1000, 1000
+    x_min, x_max = -2.0, 1.0
+    y_min, y_max = -1.5, 1.5
+    max_iterations = 200
+
+    standard = get_engine("numba")
+    start_time = time.perf_counter()
+    standard.compute(width, height, x_min, x_max, y_min, y_max, max_iterations)
+    print(f"standard engine, d=2: {time.perf_counter() - start_time:.3f} seconds")
+
+    for exponent, variant in [(2, "standard"), (3, "standard"), (5, "standard"), (8, "standard"),
+                              (2, "burning_ship"), (2, "tricorn")]:
+        start_time = time.perf_counter()
+        engine = MultibrotEngine(exponent, 2.0, variant)
+        compile_seconds = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        engine.compute(width, height, x_min, x_max, y_min, y_max, max_iterations)
+        print(f"{variant}, d={exponent}: {time.perf_counter() - start_time:.3f} seconds "
+              f"(compiled in {compile_seconds:.2f} seconds)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from multibrot import MultibrotEngine, get_numba_kernel, VARIANTS
+from render_engines import axis_coordinates, get_engine
+
+VIEW = (-2.0, 1.5, -1.5, 1.5)
+
+def escape_count(c, exponent, escape_radius, variant, max_iterations):
+    z = 0j
+    for n in range(max_iterations):
+        if z.real * z.real + z.imag * z.imag > escape_radius * escape_radius:
+            return n
+        if variant == "burning_ship":
+            z = complex(abs(z.real), abs(z.imag))
+        elif variant == "tricorn":
+            z = z.conjugate()
+        w = z
+        for _ in range(exponent - 1):
+            w = w * z
+        z = w + c
+    return max_iterations
+
+def direct(width, height, xmin, xmax, ymin, ymax, exponent, escape_radius, variant, max_iterations):
+    real = axis_coordinates(width, xmin, xmax)
+    imag = axis_coordinates(height, ymin, ymax)
+    return np.array([[escape_count(complex(x, y), exponent, escape_radius, variant, max_iterations)
+                      for x in real] for y in imag])
+
+def test_standard_exponent_two_matches_numba_engine():
+    counts, modulus_sq = MultibrotEngine().compute(40, 30, *VIEW, 100)
+    expected_counts, expected_modulus_sq = get_engine("numba").compute(40, 30, *VIEW, 100)
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_array_equal(modulus_sq, expected_modulus_sq)
+
+@pytest.mark.parametrize("exponent", [3, 4, 8])
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_variants_match_direct(exponent, variant):
+    engine = MultibrotEngine(exponent, 3.0, variant)
+    counts, _ = engine.compute(21, 17, *VIEW, 40)
+    np.testing.assert_array_equal(counts, direct(21, 17, *VIEW, exponent, 3.0, variant, 40))
+
+def test_kernels_are_cached_per_signature():
+    assert get_numba_kernel(3, 2.0, "tricorn") is get_numba_kernel(3, 2, "tricorn")
+    assert get_numba_kernel(3, 2.0, "tricorn") is not get_numba_kernel(3, 4.0, "tricorn")
+
+@pytest.mark.parametrize("arguments", [(1, 2.0, "standard"), (9, 2.0, "standard"), (2, 0.0, "standard"),
+                                       (2, 2.0, "mandelbar")])
+def test_invalid_parameters(arguments):
+    with pytest.raises(ValueError):
+        get_numba_kernel(*arguments)
+
+@pytest.mark.parametrize("exponent, variant", [(2, "burning_ship"), (5, "tricorn")])
+def test_opencl_matches_numba(exponent, variant):
+    pytest.importorskip("pyopencl")
+    counts, modulus_sq = MultibrotEngine(exponent, 2.5, variant, backend="opencl").compute(33, 25, *VIEW, 60)
+    expected_counts, expected_modulus_sq = MultibrotEngine(exponent, 2.5, variant).compute(33, 25, *VIEW, 60)
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_array_equal(modulus_sq, expected_modulus_sq)
+
+if __name__ == "__main__":
+    pytest.main()
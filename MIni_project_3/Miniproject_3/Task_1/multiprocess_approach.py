@@ -1,7 +1,14 @@
+import os
+import pickle
 import numpy as np
-import matplotlib.pyplot as plt
 import time
 from multiprocessing import Pool, cpu_count
+from instrumentation import WorkerMetrics
+from render_engines import axis_coordinates
+from symmetry import mirror_plan, apply_mirror
+
+# Bytes a pickled row takes on top of its data, for its dtype and shape
+ROW_PICKLE_OVERHEAD = len(pickle.dumps(np.zeros(0, dtype=np.int64)))
 
 def mandelbrot(c, max_iterations):
     
@@ -19,7 +26,7 @@ def mandelbrot(c, max_iterations):
     
     z = 0
     for n in range(max_iterations):
-        if abs(z) > 2:
+        if z.real * z.real + z.imag * z.imag > 4:
             return n
         z = z*z + c
     return max_iterations
@@ -45,33 +52,40 @@ def compute_mandelbrot_row(args):
     """
     
     row_idx, width, height, xmin, xmax, ymin, ymax, max_iterations = args
-    print("Arguments:")
-    print("row_idx:", row_idx)
-    print("width:", width)
-    print("height:", height)
-    print("xmin:", xmin)
-    print("xmax:", xmax)
-    print("ymin:", ymin)
-    print("ymax:", ymax)
-    print("max_iterations:", max_iterations)
     row = np.zeros(width, dtype=np.int64)
+    real_axis = axis_coordinates(width, xmin, xmax)
+    imag = axis_coordinates(height, ymin, ymax)[row_idx]
     for j in range(width):
-        real = xmin + j * (xmax - xmin) / (width - 1)
-        imag = ymin + row_idx * (ymax - ymin) / (height - 1)
+        real = real_axis[j]
         c = complex(real, imag)
         # print("real: " ,real)
         # print("imag: " ,imag)
         # print("c: " ,c)
         row[j] = mandelbrot(c, max_iterations)
-    print("Computed Row:")
-    print(row)
     return row
 
-def generate_mandelbrot_parallel(width, height, xmin, xmax, ymin, ymax, max_iterations):
+def compute_mandelbrot_row_timed(args):
+
+    """
+        Compute a single row like compute_mandelbrot_row and measure it in the worker.
+
+        Returns:
+            tuple: (row, worker, seconds), where 'worker' is the pid of the process that computed the row.
+    """
+
+    start_time = time.perf_counter()
+    row = compute_mandelbrot_row(args)
+    seconds = time.perf_counter() - start_time
+    return row, os.getpid(), seconds
+
+def generate_mandelbrot_parallel(width, height, xmin, xmax, ymin, ymax, max_iterations, metrics=None):
     
     """
         Generate the Mandelbrot set in parallel using multiple processes.
 
+        Rows that are mirror images of other rows about the real axis are copied instead of
+        computed, see symmetry.mirror_plan.
+
         Parameters:
             width (int): The width of the output array (number of columns).
             height (int): The height of the output array (number of rows).
@@ -80,6 +94,8 @@ def generate_mandelbrot_parallel(width, height, xmin, xmax, ymin, ymax, max_iter
             ymin (float): The minimum value of the imaginary part of the complex numbers.
             ymax (float): The maximum value of the imaginary part of the complex numbers.
             max_iterations (int): The maximum number of iterations for each complex number.
+            metrics (instrumentation.Instrumentation): If given, every row is timed in its worker
+                and the measurements are added to it, one buffer per worker process.
 
         Returns:
             numpy.ndarray: A 2D array representing the Mandelbrot set, where each element 
@@ -90,15 +106,35 @@ def generate_mandelbrot_parallel(width, height, xmin, xmax, ymin, ymax, max_iter
     num_processes = cpu_count()
     print("Number of CPU cores:", num_processes)
     pool = Pool(processes=num_processes)
-    args_list = [(i, width, height, xmin, xmax, ymin, ymax, max_iterations) for i in range(height)]
+    compute_rows, mirrored_rows, source_rows = mirror_plan(axis_coordinates(height, ymin, ymax))
+    args_list = [(int(i), width, height, xmin, xmax, ymin, ymax, max_iterations) for i in compute_rows]
     # print("Arguments list:", args_list)
-    mandelbrot_rows = pool.map(compute_mandelbrot_row, args_list)
+    if metrics is None:
+        mandelbrot_rows = pool.map(compute_mandelbrot_row, args_list)
+    else:
+        start_time = time.perf_counter()
+        results = pool.map(compute_mandelbrot_row_timed, args_list)
+        metrics.wall_seconds += time.perf_counter() - start_time
+        buffers = {}
+        for args, (row, worker, seconds) in zip(args_list, results):
+            if worker not in buffers:
+                buffers[worker] = WorkerMetrics(worker, max_iterations)
+            bytes_moved = len(pickle.dumps(args)) + row.nbytes + ROW_PICKLE_OVERHEAD
+            buffers[worker].record_tile(seconds, row, max_iterations, bytes_moved)
+        for buffer in buffers.values():
+            metrics.add(buffer)
+        mandelbrot_rows = [row for row, _, _ in results]
     pool.close()
     pool.join()
-    mandelbrot_set = np.array(mandelbrot_rows)
+    mandelbrot_set = np.empty((height, width), dtype=np.int64)
+    for i, row in zip(compute_rows, mandelbrot_rows):
+        mandelbrot_set[i] = row
+    apply_mirror(mandelbrot_set, mirrored_rows, source_rows)
     return mandelbrot_set
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     width, height = 1000, 1000
     x_min, x_max = -2.0, 1.0
     y_min, y_max = -1.5, 1.5
@@ -108,6 +144,8 @@ if __name__ == "__main__":
     mandelbrot_set = generate_mandelbrot_parallel(width, height, x_min, x_max, y_min, y_max, max_iterations)
     end_time = time.time()
     execution_time = end_time - start_time
+    mirrored_rows = len(mirror_plan(axis_coordinates(height, y_min, y_max))[1])
+    print(f"Rows mirrored instead of computed: {mirrored_rows} of {height}")
 
     plt.figure(figsize=(10, 10))
     plt.imshow(mandelbrot_set, extent=(x_min, x_max, y_min, y_max), cmap='hot', origin='lower')
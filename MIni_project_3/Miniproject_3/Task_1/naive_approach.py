@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import time
 
 def mandelbrot(c, max_iterations):
@@ -17,7 +16,7 @@ def mandelbrot(c, max_iterations):
     z = 0
 
     for n in range(max_iterations):
-        if abs(z) > 2:
+        if z.real * z.real + z.imag * z.imag > 4:
             return n
         z = z*z + c
     return max_iterations
@@ -72,6 +71,8 @@ def main():
 
     """
 
+    import matplotlib.pyplot as plt
+
     width, height = 1000, 1000
     x_min, x_max = -2.0, 1.0
     y_min, y_max = -1.5, 1.5
@@ -23,7 +23,7 @@ def mandelbrot(c, max_iterations):
     z = 0
 
     for n in range(max_iterations):
-        if abs(z) > 2:
+        if z.real * z.real + z.imag * z.imag > 4:
             return n
         z = z*z + c
     return max_iterations
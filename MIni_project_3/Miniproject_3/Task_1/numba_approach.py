@@ -1,7 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import time
 from numba import jit
+from render_engines import axis_coordinates
+from symmetry import mirror_plan, apply_mirror
 
 @jit(nopython=True)
 def mandelbrot(c, max_iterations):
@@ -20,17 +21,43 @@ def mandelbrot(c, max_iterations):
     
     z = 0
     for n in range(max_iterations):
-        if abs(z) > 2:
+        if z.real * z.real + z.imag * z.imag > 4:
             return n
         z = z*z + c
     return max_iterations
 
 @jit(nopython=True)
-def generate_mandelbrot(width, height, xmin, xmax, ymin, ymax, max_iterations):
+def compute_mandelbrot_rows(real, imag, max_iterations):
+    
+    """
+        Compute the Mandelbrot set for the given column and row coordinates.
+
+        Parameters:
+            real (numpy.ndarray): The real part of the complex numbers, one value per column.
+            imag (numpy.ndarray): The imaginary part of the complex numbers, one value per row.
+            max_iterations (int): The maximum number of iterations for each complex number.
+
+        Returns:
+            numpy.ndarray: A 2D array of shape (len(imag), len(real)) with the iteration counts.
+    """
+    
+    mandelbrot_set = np.zeros((imag.shape[0], real.shape[0]), dtype=np.int64)
+
+    for i in range(imag.shape[0]):
+        for j in range(real.shape[0]):
+            c = complex(real[j], imag[i])
+            mandelbrot_set[i, j] = mandelbrot(c, max_iterations)
+
+    return mandelbrot_set
+
+def generate_mandelbrot(width, height, xmin, xmax, ymin, ymax, max_iterations, snap_to_axis=False):
     
     """
         Generate the Mandelbrot set for a given range of complex numbers.
 
+        Rows that are mirror images of other rows about the real axis are copied instead of
+        computed, see symmetry.mirror_plan.
+
         Parameters:
             width (int): The width of the output array (number of columns).
             height (int): The height of the output array (number of rows).
@@ -39,6 +66,8 @@ def generate_mandelbrot(width, height, xmin, xmax, ymin, ymax, max_iterations):
             ymin (float): The minimum value of the imaginary part of the complex numbers.
             ymax (float): The maximum value of the imaginary part of the complex numbers.
             max_iterations (int): The maximum number of iterations for each complex number.
+            snap_to_axis (bool): Lay the rows out from the real axis so that every viewport
+                straddling it is mirrored, see render_engines.axis_coordinates.
 
         Returns:
             numpy.ndarray: A 2D array representing the Mandelbrot set, where each element 
@@ -46,15 +75,13 @@ def generate_mandelbrot(width, height, xmin, xmax, ymin, ymax, max_iterations):
                         complex number to escape the Mandelbrot set.
     """
     
-    real = np.linspace(xmin, xmax, width)
-    imag = np.linspace(ymin, ymax, height)
+    real = axis_coordinates(width, xmin, xmax)
+    imag = axis_coordinates(height, ymin, ymax, anchor_zero=snap_to_axis)
+    compute_rows, mirrored_rows, source_rows = mirror_plan(imag)
 
-    mandelbrot_set = np.zeros((height, width), dtype=np.int64)
-
-    for i in range(height):
-        for j in range(width):
-            c = complex(real[j], imag[i])
-            mandelbrot_set[i, j] = mandelbrot(c, max_iterations)
+    mandelbrot_set = np.empty((height, width), dtype=np.int64)
+    mandelbrot_set[compute_rows] = compute_mandelbrot_rows(real, imag[compute_rows], max_iterations)
+    apply_mirror(mandelbrot_set, mirrored_rows, source_rows)
 
     return mandelbrot_set
 
@@ -63,6 +90,8 @@ def main():
     """
         Main function to generate and display the Mandelbrot set using Numba-accelerated computation.
     """
+
+    import matplotlib.pyplot as plt
     
     width, height = 1000, 1000
     x_min, x_max = -2.0, 1.0
@@ -73,6 +102,8 @@ def main():
     mandelbrot_set = generate_mandelbrot(width, height, x_min, x_max, y_min, y_max, max_iterations)
     end_time = time.time()
     execution_time = end_time - start_time
+    mirrored_rows = len(mirror_plan(axis_coordinates(height, y_min, y_max))[1])
+    print(f"Rows mirrored instead of computed: {mirrored_rows} of {height}")
 
     plt.figure(figsize=(10, 10))
     plt.imshow(mandelbrot_set, extent=(x_min, x_max, y_min, y_max), cmap='hot', origin='lower')
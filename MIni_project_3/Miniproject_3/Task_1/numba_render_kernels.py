@@ -0,0 +1,352 @@
+import math
+import os
+import numpy as np
+from numba import config, njit, prange
+
+def prefer_fork_safe_threading():
+
+    """
+        Prefer the OpenMP threading layer for the parallel kernels of this process.
+
+        Under TBB, forking a multiprocessing.Pool after a prange kernel has run can leave the
+        process hanging at exit, so callers that may do both call this before the first parallel
+        kernel runs. It has no effect once a layer is loaded, and NUMBA_THREADING_LAYER_PRIORITY
+        still wins.
+    """
+
+    if "NUMBA_THREADING_LAYER_PRIORITY" not in os.environ:
+        config.THREADING_LAYER_PRIORITY = ["omp", "tbb", "workqueue"]
+
+@njit(inline="always")
+def escape(c_real, c_imag, max_iterations, x=0.0, y=0.0):
+
+    """
+        Iterate z -> z^2 + c from z = x + iy until |z|^2 > 4 or 'max_iterations' updates.
+
+        This is the escape loop shared by all the kernels below; it is inlined into each of them.
+
+        Returns:
+            tuple: (n, modulus_sq), the number of updates performed and |z|^2 after the last one.
+    """
+
+    x2 = x * x
+    y2 = y * y
+    n = 0
+    while n < max_iterations and x2 + y2 <= 4.0:
+        y = 2.0 * x * y + c_imag
+        x = x2 - y2 + c_real
+        x2 = x * x
+        y2 = y * y
+        n += 1
+    return n, x2 + y2
+
+@njit(parallel=True, nogil=True)
+def escape_time_grid(real, imag, max_iterations, counts, modulus_sq):
+
+    """
+        Compute escape counts and the final squared modulus for every point of a grid.
+
+        Parameters:
+            real (numpy.ndarray): The real part of the complex numbers, one value per column.
+            imag (numpy.ndarray): The imaginary part of the complex numbers, one value per row.
+            max_iterations (int): The maximum number of iterations for each complex number.
+            counts (numpy.ndarray): Output array of shape (len(imag), len(real)) for the escape counts.
+            modulus_sq (numpy.ndarray): Output array of the same shape for |z|^2 at escape.
+    """
+
+    for i in prange(imag.shape[0]):
+        c_imag = imag[i]
+        for j in range(real.shape[0]):
+            counts[i, j], modulus_sq[i, j] = escape(real[j], c_imag, max_iterations)
+
+@njit(nogil=True)
+def mandelbrot_block(real, imag, max_iterations):
+
+    """
+        Compute the escape counts of one block of the grid on the calling thread.
+
+        The kernel runs without the GIL and without its own thread pool, so a scheduler can
+        run one block per thread or process.
+
+        Parameters:
+            real (numpy.ndarray): The real coordinate of every column of the block.
+            imag (numpy.ndarray): The imaginary coordinate of every row of the block.
+            max_iterations (int): The maximum number of iterations for each complex number.
+
+        Returns:
+            numpy.ndarray: An int32 array of shape (len(imag), len(real)).
+    """
+
+    counts = np.empty((imag.shape[0], real.shape[0]), dtype=np.int32)
+    for i in range(imag.shape[0]):
+        c_imag = imag[i]
+        for j in range(real.shape[0]):
+            counts[i, j] = escape(real[j], c_imag, max_iterations)[0]
+    return counts
+
+@njit(nogil=True)
+def escape_time_tile(real, imag, max_iterations, counts, modulus_sq):
+
+    """
+        Serial version of escape_time_grid that writes into the given output views in place.
+
+        It runs without the GIL, so several Python threads can fill disjoint tiles of one shared
+        output array at the same time.
+
+        Parameters:
+            real (numpy.ndarray): The real coordinate of every column of the tile.
+            imag (numpy.ndarray): The imaginary coordinate of every row of the tile.
+            max_iterations (int): The maximum number of iterations for each complex number.
+            counts (numpy.ndarray): View of shape (len(imag), len(real)) for the escape counts.
+            modulus_sq (numpy.ndarray): View of the same shape for |z|^2 at escape.
+    """
+
+    for i in range(imag.shape[0]):
+        c_imag = imag[i]
+        for j in range(real.shape[0]):
+            counts[i, j], modulus_sq[i, j] = escape(real[j], c_imag, max_iterations)
+
+@njit(parallel=True, nogil=True)
+def escape_time_skip(real, imag, max_iterations, safe, factor, counts):
+
+    """
+        Compute escape counts, skipping the pixels whose nearest low-resolution cell is marked safe.
+
+        Pixel (i, j) belongs to low-resolution cell ((i + factor // 2) // factor, (j + factor // 2) // factor),
+        clipped to the size of 'safe'. Skipped pixels are given 'max_iterations' without iterating.
+
+        Parameters:
+            real (numpy.ndarray): The real part of the complex numbers, one value per column.
+            imag (numpy.ndarray): The imaginary part of the complex numbers, one value per row.
+            max_iterations (int): The maximum number of iterations for each complex number.
+            safe (numpy.ndarray): A boolean array of low-resolution cells known to be interior.
+            factor (int): The number of pixels per low-resolution cell along each axis.
+            counts (numpy.ndarray): Output array of shape (len(imag), len(real)) for the escape counts.
+    """
+
+    half = factor // 2
+    for i in prange(imag.shape[0]):
+        row = min((i + half) // factor, safe.shape[0] - 1)
+        c_imag = imag[i]
+        for j in range(real.shape[0]):
+            if safe[row, min((j + half) // factor, safe.shape[1] - 1)]:
+                counts[i, j] = max_iterations
+                continue
+            counts[i, j] = escape(real[j], c_imag, max_iterations)[0]
+
+@njit(parallel=True, nogil=True)
+def escape_time_points(real, imag, rows, columns, max_iterations, counts):
+
+    """
+        Compute the escape counts of scattered pixels of a grid.
+
+        Parameters:
+            real (numpy.ndarray): The real part of the complex numbers, one value per column.
+            imag (numpy.ndarray): The imaginary part of the complex numbers, one value per row.
+            rows (numpy.ndarray): The row of every pixel to compute.
+            columns (numpy.ndarray): The column of every pixel to compute, same length as 'rows'.
+            max_iterations (int): The maximum number of iterations for each complex number.
+            counts (numpy.ndarray): Output array of len(rows) for the escape counts.
+    """
+
+    for k in prange(rows.shape[0]):
+        counts[k] = escape(real[columns[k]], imag[rows[k]], max_iterations)[0]
+
+@njit(parallel=True, nogil=True)
+def julia_batch(c_values, real, imag, max_iterations, counts):
+
+    """
+        Compute escape counts of the Julia sets of several parameters 'c' in one parallel pass.
+
+        Parameters:
+            c_values (numpy.ndarray): The complex parameters, one image per value.
+            real (numpy.ndarray): The real part of the starting points z0, one value per column.
+            imag (numpy.ndarray): The imaginary part of the starting points z0, one value per row.
+            max_iterations (int): The maximum number of iterations for each starting point.
+            counts (numpy.ndarray): Output array of shape (len(c_values), len(imag), len(real)).
+    """
+
+    height = imag.shape[0]
+    for k in prange(c_values.shape[0] * height):
+        image = k // height
+        i = k % height
+        c_real = c_values[image].real
+        c_imag = c_values[image].imag
+        for j in range(real.shape[0]):
+            counts[image, i, j] = escape(c_real, c_imag, max_iterations, real[j], imag[i])[0]
+
+@njit(nogil=True)
+def distance_sample(c_real, c_imag, max_iterations, escape_radius_sq):
+
+    """
+        Iterate one point while tracking the derivative dz/dc.
+
+        Parameters:
+            c_real (float): The real part of the complex number.
+            c_imag (float): The imaginary part of the complex number.
+            max_iterations (int): The maximum number of iterations.
+            escape_radius_sq (float): The squared bailout radius. A large radius makes both the
+                distance estimate and the smooth value more accurate.
+
+        Returns:
+            tuple: (value, distance). 'value' is the normalized smooth iteration count in [0, 1]
+                (0 for points that do not escape) and 'distance' the exterior distance estimate
+                |z| log|z| / |dz/dc|, or -1.0 for points that do not escape.
+    """
+
+    x = 0.0
+    y = 0.0
+    x2 = 0.0
+    y2 = 0.0
+    dx = 0.0
+    dy = 0.0
+    n = 0
+    while n < max_iterations and x2 + y2 <= escape_radius_sq:
+        new_dx = 2.0 * (x * dx - y * dy) + 1.0
+        dy = 2.0 * (x * dy + y * dx)
+        dx = new_dx
+        y = 2.0 * x * y + c_imag
+        x = x2 - y2 + c_real
+        x2 = x * x
+        y2 = y * y
+        n += 1
+
+    if x2 + y2 <= escape_radius_sq:
+        return 0.0, -1.0
+
+    modulus = math.sqrt(x2 + y2)
+    log_modulus = math.log(modulus)
+    distance = modulus * log_modulus / math.sqrt(dx * dx + dy * dy)
+    value = (n + 1 - math.log2(log_modulus)) / max_iterations
+    return min(max(value, 0.0), 1.0), distance
+
+@njit(parallel=True, nogil=True)
+def distance_estimate_grid(real, imag, max_iterations, escape_radius_sq, values, distances):
+
+    """
+        Compute the smooth value and the exterior distance estimate at the centre of every pixel.
+        See distance_sample for the meaning of the outputs.
+    """
+
+    for i in prange(imag.shape[0]):
+        for j in range(real.shape[0]):
+            values[i, j], distances[i, j] = distance_sample(real[j], imag[i], max_iterations, escape_radius_sq)
+
+@njit(parallel=True, nogil=True)
+def supersample_pixels(rows, cols, sides, real, imag, pixel_dx, pixel_dy, max_iterations, escape_radius_sq, values):
+
+    """
+        Replace the value of selected pixels by the mean of a regular sides x sides grid of samples.
+
+        Parameters:
+            rows (numpy.ndarray): The row index of every selected pixel.
+            cols (numpy.ndarray): The column index of every selected pixel.
+            sides (numpy.ndarray): The number of samples per side for every selected pixel.
+            real (numpy.ndarray): The real coordinate of every column.
+            imag (numpy.ndarray): The imaginary coordinate of every row.
+            pixel_dx (float): The width of a pixel in the complex plane.
+            pixel_dy (float): The height of a pixel in the complex plane.
+            max_iterations (int): The maximum number of iterations.
+            escape_radius_sq (float): The squared bailout radius.
+            values (numpy.ndarray): The image to update in place.
+    """
+
+    for k in prange(rows.shape[0]):
+        side = sides[k]
+        total = 0.0
+        for a in range(side):
+            c_imag = imag[rows[k]] + ((a + 0.5) / side - 0.5) * pixel_dy
+            for b in range(side):
+                c_real = real[cols[k]] + ((b + 0.5) / side - 0.5) * pixel_dx
+                total += distance_sample(c_real, c_imag, max_iterations, escape_radius_sq)[0]
+        values[rows[k], cols[k]] = total / (side * side)
+
+@njit(nogil=True)
+def buddhabrot_orbits(c_real, c_imag, max_iterations, xmin, ymin, x_scale, y_scale, histogram):
+
+    """
+        Deposit the orbits of the escaping samples into a histogram on the calling thread.
+
+        Samples inside the main cardioid or the period-2 bulb never escape and are rejected without
+        iterating. The others are iterated once without storing anything; only those that escape
+        are iterated a second time, adding one hit for every orbit point z_1 .. z_n in the viewport.
+
+        Parameters:
+            c_real (numpy.ndarray): The real parts of the samples.
+            c_imag (numpy.ndarray): The imaginary parts of the samples.
+            max_iterations (int): The maximum number of iterations for each sample.
+            xmin (float): The real coordinate of the left edge of the histogram.
+            ymin (float): The imaginary coordinate of the bottom edge of the histogram.
+            x_scale (float): Columns per unit along the real axis.
+            y_scale (float): Rows per unit along the imaginary axis.
+            histogram (numpy.ndarray): The int64 array of shape (height, width) to add the hits to.
+
+        Returns:
+            tuple: (rejected, escaped), the number of samples rejected up front and the number of
+                samples whose orbit was deposited.
+    """
+
+    height, width = histogram.shape
+    rejected = 0
+    escaped = 0
+    for k in range(c_real.shape[0]):
+        cr = c_real[k]
+        ci = c_imag[k]
+        xq = cr - 0.25
+        q = xq * xq + ci * ci
+        if q * (q + xq) <= 0.25 * ci * ci or (cr + 1.0) * (cr + 1.0) + ci * ci <= 0.0625:
+            rejected += 1
+            continue
+
+        # An orbit may escape on the very last update, so test the modulus rather than the count
+        n, modulus_sq = escape(cr, ci, max_iterations)
+        if modulus_sq <= 4.0:
+            continue
+
+        escaped += 1
+        x = 0.0
+        y = 0.0
+        for _ in range(n):
+            x, y = x * x - y * y + cr, 2.0 * x * y + ci
+            column = (x - xmin) * x_scale
+            row = (y - ymin) * y_scale
+            if 0.0 <= column < width and 0.0 <= row < height:
+                histogram[int(row), int(column)] += 1
+    return rejected, escaped
+
+@njit(parallel=True, nogil=True)
+def buddhabrot_parallel(c_real, c_imag, max_iterations, xmin, ymin, x_scale, y_scale, histograms):
+
+    """
+        Split a batch of samples over the threads, each depositing into its own histogram.
+
+        Parameters:
+            c_real, c_imag, max_iterations, xmin, ymin, x_scale, y_scale: See buddhabrot_orbits.
+            histograms (numpy.ndarray): An int64 array of shape (threads, height, width); thread
+                'k' only writes to histograms[k], so no hit is ever contended.
+
+        Returns:
+            numpy.ndarray: (rejected, escaped) for every thread, an int64 array of shape (threads, 2).
+    """
+
+    threads = histograms.shape[0]
+    chunk = (c_real.shape[0] + threads - 1) // threads
+    totals = np.zeros((threads, 2), dtype=np.int64)
+    for k in prange(threads):
+        start = min(k * chunk, c_real.shape[0])
+        stop = min(start + chunk, c_real.shape[0])
+        rejected, escaped = buddhabrot_orbits(c_real[start:stop], c_imag[start:stop], max_iterations,
+                                              xmin, ymin, x_scale, y_scale, histograms[k])
+        totals[k, 0] = rejected
+        totals[k, 1] = escaped
+    return totals
+
+def warm_up():
+
+    """
+        Trigger compilation of the kernels on a tiny grid so later calls only pay for the computation.
+    """
+
+    axis = np.zeros(2, dtype=np.float64)
+    escape_time_grid(axis, axis, 1, np.zeros((2, 2), dtype=np.int32), np.zeros((2, 2), dtype=np.float64))
+    julia_batch(np.zeros(1, dtype=np.complex128), axis, axis, 1, np.zeros((1, 2, 2), dtype=np.int32))
@@ -0,0 +1,337 @@
+import os
+import time
+import numpy as np
+from symmetry import mirror_plan, apply_mirror, contiguous_block
+
+OPENCL_KERNEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Task_2")
+
+def axis_coordinates(n, lo, hi, anchor_zero=False):
+
+    """
+        Map pixel indices to coordinates along one axis of the complex plane.
+
+        The mapping interpolates between both ends, so the first and last pixels land exactly
+        on 'lo' and 'hi' and a range symmetric around zero gives exactly mirrored values.
+
+        With 'anchor_zero', a range that straddles zero is instead laid out from zero outward:
+        pixel k sits at (2k - K) half steps, where K is the nearest whole number of half steps
+        from 'lo' to zero. The pitch stays (hi - lo) / (n - 1) and the whole grid moves by at
+        most a quarter pixel, but coordinates on both sides of zero are exact negatives of each
+        other, so every row on the shorter side of the real axis can be mirrored.
+
+        Parameters:
+            n (int): The number of pixels along the axis.
+            lo (float): The coordinate of the first pixel.
+            hi (float): The coordinate of the last pixel.
+            anchor_zero (bool): Lay a range that straddles zero out from zero, see above.
+
+        Returns:
+            numpy.ndarray: A float64 array of 'n' coordinates.
+    """
+
+    if n == 1:
+        return np.array([lo], dtype=np.float64)
+    idx = np.arange(n, dtype=np.float64)
+    if anchor_zero and lo < 0 < hi:
+        half_step = (hi - lo) / (2 * (n - 1))
+        return (2 * idx - round(-lo / half_step)) * half_step
+    return (lo * (n - 1 - idx) + hi * idx) / (n - 1)
+
+class EscapeTimeEngine:
+
+    """
+        Common part of the escape-time engines. compute() maps the viewport to coordinates, works
+        out which rows are mirror images of others about the real axis and lets the subclass
+        compute only the remaining rows through compute_rows(); the mirrored rows are then copied.
+
+        After every call 'mirrored_rows' holds the number of rows that were copied instead of computed.
+        Set 'symmetric' to False to compute every row. Rows are only mirrored where the exact
+        viewport gives exactly mirrored coordinates; set 'snap_to_axis' to lay the imaginary axis
+        out from zero (see axis_coordinates) so that every viewport straddling the real axis is
+        mirrored, at the cost of moving the rows by up to a quarter pixel.
+    """
+
+    name = None
+    symmetric = True
+    snap_to_axis = False
+    mirrored_rows = 0
+
+    def compute(self, width, height, xmin, xmax, ymin, ymax, max_iterations):
+
+        """
+            Compute escape counts and the squared modulus at escape for a viewport.
+
+            Parameters:
+                width (int): The width of the output array (number of columns).
+                height (int): The height of the output array (number of rows).
+                xmin (float): The minimum value of the real part of the complex numbers.
+                xmax (float): The maximum value of the real part of the complex numbers.
+                ymin (float): The minimum value of the imaginary part of the complex numbers.
+                ymax (float): The maximum value of the imaginary part of the complex numbers.
+                max_iterations (int): The maximum number of iterations for each complex number.
+
+            Returns:
+                tuple: (counts, modulus_sq), two arrays of shape (height, width) with dtypes
+                    int32 and float64. Row 0 corresponds to 'ymin'.
+        """
+
+        real = axis_coordinates(width, xmin, xmax)
+        imag = axis_coordinates(height, ymin, ymax, anchor_zero=self.snap_to_axis)
+        counts = np.empty((height, width), dtype=np.int32)
+        modulus_sq = np.empty((height, width), dtype=np.float64)
+
+        if self.symmetric:
+            compute_rows, mirrored_rows, source_rows = mirror_plan(imag)
+        else:
+            compute_rows, mirrored_rows, source_rows = np.arange(height), np.array([], dtype=np.intp), None
+
+        block = contiguous_block(compute_rows)
+        if block is not None:
+            start, stop = block
+            self.compute_rows(real, imag[start:stop], max_iterations, counts[start:stop], modulus_sq[start:stop])
+        else:
+            part_counts = np.empty((len(compute_rows), width), dtype=np.int32)
+            part_modulus_sq = np.empty((len(compute_rows), width), dtype=np.float64)
+            self.compute_rows(real, imag[compute_rows], max_iterations, part_counts, part_modulus_sq)
+            counts[compute_rows] = part_counts
+            modulus_sq[compute_rows] = part_modulus_sq
+
+        apply_mirror(counts, mirrored_rows, source_rows)
+        apply_mirror(modulus_sq, mirrored_rows, source_rows)
+        self.mirrored_rows = len(mirrored_rows)
+        return counts, modulus_sq
+
+    def compute_rows(self, real, imag, max_iterations, counts, modulus_sq):
+
+        """
+            Fill 'counts' and 'modulus_sq', of shape (len(imag), len(real)), for the given coordinates.
+        """
+
+        raise NotImplementedError
+
+class NumpyEngine(EscapeTimeEngine):
+
+    """
+        Vectorized escape-time engine using only numpy. It keeps iterating only the points that
+        have not escaped yet, so the cost shrinks as the image resolves.
+    """
+
+    name = "numpy"
+
+    def compute_rows(self, real, imag, max_iterations, counts, modulus_sq):
+        c = (real[np.newaxis, :] + 1j * imag[:, np.newaxis]).ravel()
+        flat_counts = counts.reshape(-1)
+        flat_modulus_sq = modulus_sq.reshape(-1)
+        flat_counts[:] = max_iterations
+        z = np.zeros_like(c)
+        active = np.arange(c.size)
+
+        for n in range(max_iterations + 1):
+            m2 = z.real * z.real + z.imag * z.imag
+            escaped = m2 > 4.0
+            if n == max_iterations:
+                flat_modulus_sq[active] = m2
+                break
+            if escaped.any():
+                flat_counts[active[escaped]] = n
+                flat_modulus_sq[active[escaped]] = m2[escaped]
+                keep = ~escaped
+                z, c, active = z[keep], c[keep], active[keep]
+                if active.size == 0:
+                    break
+            z = z * z + c
+
+class NumbaEngine(EscapeTimeEngine):
+
+    """
+        Escape-time engine backed by a parallel Numba kernel. Numba is imported and the kernel
+        compiled when the engine is created, not when this module is imported.
+    """
+
+    name = "numba"
+
+    def __init__(self):
+        import numba_render_kernels
+        self._kernels = numba_render_kernels
+        self._kernels.prefer_fork_safe_threading()
+        self._kernels.warm_up()
+
+    def compute_rows(self, real, imag, max_iterations, counts, modulus_sq):
+        self._kernels.escape_time_grid(real, imag, max_iterations, counts, modulus_sq)
+
+class ThreadPoolEngine(EscapeTimeEngine):
+
+    """
+        Escape-time engine that runs a serial nogil Numba kernel on a pool of Python threads.
+
+        The rows are cut into bands of 'tile_rows' rows. Every thread takes the next band from a
+        shared iterator as soon as it is done with the previous one, so expensive bands near the
+        set do not hold up the others, and writes it straight into the shared output arrays.
+        Nothing is pickled or copied, and the pool is created once per engine.
+
+        Set 'metrics' to an instrumentation.Instrumentation to time every band; each thread then
+        records into its own buffer.
+
+        Parameters:
+            max_workers (int): The number of threads, one per core when None.
+            tile_rows (int): The number of rows per band.
+    """
+
+    name = "threads"
+    metrics = None
+
+    def __init__(self, max_workers=None, tile_rows=8):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        import numba_render_kernels
+        self._kernels = numba_render_kernels
+        self._kernels.prefer_fork_safe_threading()
+        self._lock = threading.Lock()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.tile_rows = tile_rows
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        axis = np.zeros(2, dtype=np.float64)
+        self._kernels.escape_time_tile(axis, axis, 1, np.zeros((2, 2), dtype=np.int32), np.zeros((2, 2), dtype=np.float64))
+
+    def _work(self, tiles, real, imag, max_iterations, counts, modulus_sq, buffer=None):
+        done = 0
+        while True:
+            with self._lock:
+                start = next(tiles, None)
+            if start is None:
+                return done
+            stop = start + self.tile_rows
+            if buffer is None:
+                self._kernels.escape_time_tile(real, imag[start:stop], max_iterations, counts[start:stop], modulus_sq[start:stop])
+            else:
+                start_time = time.perf_counter()
+                self._kernels.escape_time_tile(real, imag[start:stop], max_iterations, counts[start:stop], modulus_sq[start:stop])
+                buffer.record_tile(time.perf_counter() - start_time, counts[start:stop], max_iterations)
+            done += 1
+
+    def compute_rows(self, real, imag, max_iterations, counts, modulus_sq):
+        imag = np.ascontiguousarray(imag)
+        tiles = iter(range(0, len(imag), self.tile_rows))
+        metrics = self.metrics
+        if metrics is None:
+            buffers = [None] * self.max_workers
+        else:
+            from instrumentation import WorkerMetrics
+            buffers = [WorkerMetrics(f"thread-{k}", max_iterations) for k in range(self.max_workers)]
+            start_time = time.perf_counter()
+        workers = [self.executor.submit(self._work, tiles, real, imag, max_iterations, counts, modulus_sq, buffer)
+                   for buffer in buffers]
+        for worker in workers:
+            worker.result()
+        if metrics is not None:
+            metrics.wall_seconds += time.perf_counter() - start_time
+            for buffer in buffers:
+                metrics.add(buffer)
+
+class OpenCLEngine(EscapeTimeEngine):
+
+    """
+        Escape-time engine running 'calculate_mandelbrot_smooth' from Task_2/mandelbrot_render.cl.
+        The context, queue and built program are created once and reused for every frame.
+    """
+
+    name = "opencl"
+
+    def __init__(self, device_type="GPU"):
+        import pyopencl as cl
+        self.cl = cl
+
+        devices = []
+        for wanted in (device_type, "CPU"):
+            for platform in cl.get_platforms():
+                try:
+                    devices.extend(platform.get_devices(device_type=getattr(cl.device_type, wanted)))
+                except cl.LogicError:
+                    continue
+            if devices:
+                break
+        if not devices:
+            raise RuntimeError("No OpenCL-compatible GPU or CPU found.")
+
+        self.device = devices[0]
+        self.context = cl.Context([self.device])
+        self.queue = cl.CommandQueue(self.context)
+        self._programs = {}
+        self._kernels = {}
+        self._kernel = self.get_kernel("mandelbrot_render.cl", "calculate_mandelbrot_smooth")
+
+    def get_program(self, filename, options=()):
+
+        """
+            Build (once) and return an OpenCL program from a kernel file in Task_2.
+
+            Parameters:
+                filename (str): The name of the .cl file in the Task_2 directory.
+                options (tuple): Build options passed to the OpenCL compiler.
+
+            Returns:
+                pyopencl.Program: The built program.
+        """
+
+        key = (filename, tuple(options))
+        if key not in self._programs:
+            with open(os.path.join(OPENCL_KERNEL_DIR, filename), "r") as f:
+                self._programs[key] = self.cl.Program(self.context, f.read()).build(options=list(options))
+        return self._programs[key]
+
+    def get_kernel(self, filename, name, options=()):
+
+        """
+            Return the kernel 'name' from a program built with get_program, creating it only once.
+        """
+
+        key = (filename, name, tuple(options))
+        if key not in self._kernels:
+            self._kernels[key] = self.cl.Kernel(self.get_program(filename, options), name)
+        return self._kernels[key]
+
+    def compute_rows(self, real, imag, max_iterations, counts, modulus_sq):
+        cl = self.cl
+        mf = cl.mem_flags
+        real_buf = cl.Buffer(self.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=real)
+        imag_buf = cl.Buffer(self.context, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=np.ascontiguousarray(imag))
+        counts_buf = cl.Buffer(self.context, mf.WRITE_ONLY, counts.nbytes)
+        modulus_buf = cl.Buffer(self.context, mf.WRITE_ONLY, modulus_sq.nbytes)
+
+        self._kernel(self.queue, (len(real), len(imag)), None, counts_buf, modulus_buf, real_buf, imag_buf,
+                     np.int32(len(real)), np.int32(max_iterations))
+        cl.enqueue_copy(self.queue, counts, counts_buf)
+        cl.enqueue_copy(self.queue, modulus_sq, modulus_buf)
+
+ENGINES = {
+    "numpy": NumpyEngine,
+    "numba": NumbaEngine,
+    "threads": ThreadPoolEngine,
+    "opencl": OpenCLEngine,
+}
+
+_engine_cache = {}
+engine_load_times = {}
+
+def get_engine(name):
+
+    """
+        Return the engine called 'name', creating it on first use.
+
+        Creating an engine imports its backend and compiles its kernels. The time this takes is
+        recorded in 'engine_load_times' so it can be reported apart from the rendering itself.
+
+        Parameters:
+            name (str): One of the keys of ENGINES.
+
+        Returns:
+            object: An engine with a compute(width, height, xmin, xmax, ymin, ymax, max_iterations) method.
+    """
+
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}', expected one of {sorted(ENGINES)}")
+    if name not in _engine_cache:
+        start_time = time.perf_counter()
+        _engine_cache[name] = ENGINES[name]()
+        engine_load_times[name] = time.perf_counter() - start_time
+    return _engine_cache[name]
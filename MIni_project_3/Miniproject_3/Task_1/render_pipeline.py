@@ -0,0 +1,184 @@
+import argparse
+import struct
+import time
+import zlib
+import numpy as np
+from render_engines import ENGINES, get_engine, engine_load_times
+
+PALETTE_ANCHORS = {
+    "hot": [(0.0, (0, 0, 0)), (0.375, (255, 0, 0)), (0.75, (255, 255, 0)), (1.0, (255, 255, 255))],
+    "ocean": [(0.0, (0, 7, 100)), (0.16, (32, 107, 203)), (0.42, (237, 255, 255)), (0.64, (255, 170, 0)), (1.0, (0, 2, 0))],
+    "grey": [(0.0, (0, 0, 0)), (1.0, (255, 255, 255))],
+}
+
+INTERIOR_COLOUR = (0, 0, 0)
+
+_palette_cache = {}
+
+def get_palette(name, size=1024):
+
+    """
+        Build (once) a lookup table of RGB colours by interpolating between the palette anchors.
+
+        Parameters:
+            name (str): One of the keys of PALETTE_ANCHORS.
+            size (int): The number of entries in the table.
+
+        Returns:
+            numpy.ndarray: A uint8 array of shape (size, 3).
+    """
+
+    key = (name, size)
+    if key not in _palette_cache:
+        if name not in PALETTE_ANCHORS:
+            raise ValueError(f"Unknown palette '{name}', expected one of {sorted(PALETTE_ANCHORS)}")
+        positions = [p for p, _ in PALETTE_ANCHORS[name]]
+        colours = np.array([c for _, c in PALETTE_ANCHORS[name]], dtype=np.float64)
+        t = np.linspace(0.0, 1.0, size)
+        lut = np.empty((size, 3), dtype=np.uint8)
+        for channel in range(3):
+            lut[:, channel] = np.round(np.interp(t, positions, colours[:, channel]))
+        _palette_cache[key] = lut
+    return _palette_cache[key]
+
+def colourize(counts, modulus_sq, max_iterations, palette="hot"):
+
+    """
+        Turn escape counts into an RGB image using smooth (normalized iteration count) colouring.
+
+        The smooth value n + 1 - log2(log|z|), its normalization and the palette lookup are done
+        in one vectorized pass over a single float buffer, without intermediate images.
+
+        Parameters:
+            counts (numpy.ndarray): Escape counts of shape (height, width).
+            modulus_sq (numpy.ndarray): |z|^2 at escape, same shape as 'counts'.
+            max_iterations (int): The iteration limit used to compute 'counts'.
+            palette (str): The name of the palette, see PALETTE_ANCHORS.
+
+        Returns:
+            numpy.ndarray: A uint8 array of shape (height, width, 3).
+    """
+
+    lut = get_palette(palette)
+    interior = counts >= max_iterations
+
+    # mu = n + 1 - log2(0.5 * log(|z|^2)), computed in place in 'mu'
+    mu = np.maximum(modulus_sq, 4.0)
+    np.log(mu, out=mu)
+    mu *= 0.5
+    np.log2(mu, out=mu)
+    np.subtract(counts + 1, mu, out=mu)
+    mu *= (len(lut) - 1) / max_iterations
+    np.clip(mu, 0, len(lut) - 1, out=mu)
+
+    rgb = lut.take(mu.astype(np.intp), axis=0)
+    rgb[interior] = INTERIOR_COLOUR
+    return rgb
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+def write_png(path, rgb, compression=6):
+
+    """
+        Write an RGB image to a PNG file using only the standard library.
+
+        Row 0 of 'rgb' is the bottom of the image (the 'ymin' side), matching origin='lower'
+        in the plotting code, so rows are written in reverse order.
+
+        Parameters:
+            path (str): The output file name.
+            rgb (numpy.ndarray): A uint8 array of shape (height, width, 3).
+            compression (int): The zlib compression level, 0-9.
+    """
+
+    height, width, _ = rgb.shape
+    raw = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+    raw[:, 1:] = rgb[::-1].reshape(height, 3 * width)
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(_png_chunk(b"IDAT", zlib.compress(raw.tobytes(), compression)))
+        f.write(_png_chunk(b"IEND", b""))
+
+def render_to_png(path, width, height, xmin, xmax, ymin, ymax, max_iterations, engine="numba", palette="hot",
+                  snap_to_axis=False):
+
+    """
+        Render a viewport of the Mandelbrot set straight to a PNG file, without matplotlib.
+
+        Parameters:
+            path (str): The output file name.
+            width (int): The width of the image (number of pixels).
+            height (int): The height of the image (number of pixels).
+            xmin (float): The minimum value of the real part of the complex plane.
+            xmax (float): The maximum value of the real part of the complex plane.
+            ymin (float): The minimum value of the imaginary part of the complex plane.
+            ymax (float): The maximum value of the imaginary part of the complex plane.
+            max_iterations (int): The maximum number of iterations to perform.
+            engine (str): The engine to compute with, see render_engines.ENGINES.
+            palette (str): The name of the palette, see PALETTE_ANCHORS.
+            snap_to_axis (bool): Lay the rows out from the real axis so that every viewport
+                straddling it is mirrored, see render_engines.axis_coordinates.
+
+        Returns:
+            dict: Timings in seconds. 'import' is the time spent importing the backend and
+                compiling its kernels (zero once the engine is warm), 'compute', 'colour' and
+                'write' are the stages of this render and 'total' is the end-to-end time.
+    """
+
+    start_time = time.perf_counter()
+    already_loaded = engine in engine_load_times
+    renderer = get_engine(engine)
+    renderer.snap_to_axis = snap_to_axis
+    loaded_time = time.perf_counter()
+
+    counts, modulus_sq = renderer.compute(width, height, xmin, xmax, ymin, ymax, max_iterations)
+    computed_time = time.perf_counter()
+    rgb = colourize(counts, modulus_sq, max_iterations, palette)
+    coloured_time = time.perf_counter()
+    write_png(path, rgb)
+    end_time = time.perf_counter()
+
+    return {
+        "import": 0.0 if already_loaded else engine_load_times[engine],
+        "compute": computed_time - loaded_time,
+        "colour": coloured_time - computed_time,
+        "write": end_time - coloured_time,
+        "total": end_time - start_time,
+    }
+
+def main(argv=None):
+
+    """
+        Command line entry point: render one PNG and optionally print the stage timings.
+    """
+
+    parser = argparse.ArgumentParser(description="Render the Mandelbrot set to a PNG file without a display.")
+    parser.add_argument("output", help="PNG file to write")
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=1000)
+    parser.add_argument("--xmin", type=float, default=-2.0)
+    parser.add_argument("--xmax", type=float, default=1.0)
+    parser.add_argument("--ymin", type=float, default=-1.5)
+    parser.add_argument("--ymax", type=float, default=1.5)
+    parser.add_argument("--max-iterations", type=int, default=100)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="numba")
+    parser.add_argument("--palette", choices=sorted(PALETTE_ANCHORS), default="hot")
+    parser.add_argument("--timings", action="store_true", help="print import and render timings")
+    parser.add_argument("--snap-to-axis", action="store_true",
+                        help="move the rows by up to a quarter pixel so the whole view below or above the real axis is mirrored")
+    args = parser.parse_args(argv)
+
+    timings = render_to_png(args.output, args.width, args.height, args.xmin, args.xmax, args.ymin, args.ymax,
+                            args.max_iterations, engine=args.engine, palette=args.palette,
+                            snap_to_axis=args.snap_to_axis)
+    if args.timings:
+        for stage, seconds in timings.items():
+            print(f"{stage}: {seconds:.4f} seconds")
+        mirrored_rows = get_engine(args.engine).mirrored_rows
+        print(f"mirrored rows: {mirrored_rows} of {args.height} ({mirrored_rows / args.height:.0%} of the work saved)")
+
+if __name__ == "__main__":
+    main()
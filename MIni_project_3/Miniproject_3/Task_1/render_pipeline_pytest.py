@@ -0,0 +1,65 @@
+import os
+import struct
+import subprocess
+import sys
+import zlib
+import numpy as np
+import pytest
+from multiprocess_approach import mandelbrot
+from render_engines import axis_coordinates, get_engine
+from render_pipeline import colourize, write_png, render_to_png
+
+def test_import_is_lazy():
+    # Importing the pipeline must not pull in numba, pyopencl or matplotlib
+    code = "import sys, render_pipeline; print(sorted(m for m in ('numba', 'pyopencl', 'matplotlib') if m in sys.modules))"
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert output.decode().strip() == "[]"
+
+def test_numpy_engine_matches_kernel():
+    width, height, max_iterations = 7, 5, 50
+    counts, modulus_sq = get_engine("numpy").compute(width, height, -2.0, 1.0, -1.5, 1.5, max_iterations)
+    real = axis_coordinates(width, -2.0, 1.0)
+    imag = axis_coordinates(height, -1.5, 1.5)
+    expected = [[mandelbrot(complex(r, i), max_iterations) for r in real] for i in imag]
+    np.testing.assert_array_equal(counts, expected)
+    assert np.all(modulus_sq[counts < max_iterations] > 4.0)
+
+def test_numba_engine_matches_numpy_engine():
+    args = (40, 30, -2.0, 1.0, -1.5, 1.5, 80)
+    numpy_counts, numpy_modulus = get_engine("numpy").compute(*args)
+    numba_counts, numba_modulus = get_engine("numba").compute(*args)
+    np.testing.assert_array_equal(numba_counts, numpy_counts)
+    np.testing.assert_allclose(numba_modulus, numpy_modulus)
+
+def test_axis_coordinates_symmetric():
+    imag = axis_coordinates(1000, -1.5, 1.5)
+    assert imag[0] == -1.5 and imag[-1] == 1.5
+    np.testing.assert_array_equal(imag, -imag[::-1])
+
+def test_colourize_interior_is_black():
+    counts = np.array([[0, 3], [10, 10]], dtype=np.int32)
+    modulus_sq = np.array([[5.0, 20.0], [1.0, 1.0]])
+    rgb = colourize(counts, modulus_sq, 10)
+    assert rgb.shape == (2, 2, 3) and rgb.dtype == np.uint8
+    assert np.all(rgb[1] == 0)
+    assert rgb[0, 1].sum() > rgb[0, 0].sum()
+
+def test_write_png_round_trip(tmp_path):
+    rgb = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    path = tmp_path / "image.png"
+    write_png(str(path), rgb)
+    data = path.read_bytes()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    width, height = struct.unpack(">II", data[16:24])
+    assert (width, height) == (3, 2)
+    idat_length = struct.unpack(">I", data[33:37])[0]
+    raw = np.frombuffer(zlib.decompress(data[41:41 + idat_length]), dtype=np.uint8).reshape(2, 10)
+    np.testing.assert_array_equal(raw[:, 1:].reshape(2, 3, 3), rgb[::-1])
+
+def test_render_to_png_timings(tmp_path):
+    timings = render_to_png(str(tmp_path / "frame.png"), 32, 24, -2.0, 1.0, -1.5, 1.5, 50, engine="numpy")
+    assert set(timings) == {"import", "compute", "colour", "write", "total"}
+    assert (tmp_path / "frame.png").exists()
+
+if __name__ == "__main__":
+    pytest.main()
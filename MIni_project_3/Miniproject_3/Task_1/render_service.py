@@ -0,0 +1,275 @@
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from render_engines import axis_coordinates
+
+def render_rows(real, imag, max_iterations):
+
+    """
+        Compute a band of rows with the numba block kernel. This is the unit of work handed to
+        the executor; it is a plain module-level function so a ProcessPoolExecutor can run it too.
+    """
+
+    import numba_render_kernels
+    return numba_render_kernels.mandelbrot_block(real, imag, max_iterations)
+
+class RenderService:
+
+    """
+        Asynchronous front end for the CPU renderer.
+
+        Rendering runs in an executor, one band of 'tile_rows' rows at a time, so the event loop
+        stays responsive. Identical requests in flight share one render. When every client
+        waiting for a render has gone away, its remaining tiles are cancelled. A request with
+        a deadline is rendered at a lower resolution when the full one is not expected to finish
+        in time. The coarsest resolution is rendered alongside as a hedge: if the chosen
+        resolution is still not done at the deadline, because there is no estimate yet or the
+        estimate was wrong, the request is served from the hedge and its claim on the slower
+        render is dropped.
+
+        Parameters:
+            executor (concurrent.futures.Executor): Where the tiles run. A thread pool with one
+                thread per core is used when None; the numba kernel releases the GIL.
+            fallback_executor (concurrent.futures.Executor): Where the renders at the coarsest
+                resolution run, so they never queue behind finer tiles. A single thread when None.
+            tile_rows (int): The number of rows per tile, which is also the granularity of cancellation.
+            max_tiles_in_flight (int): How many tiles of one render may be queued in the executor.
+            max_downscale (int): The largest factor by which a deadline may reduce the resolution.
+            deadline_reserve (float): The fraction of a deadline kept back to hand over the coarse
+                result when the chosen resolution is late.
+    """
+
+    def __init__(self, executor=None, tile_rows=16, max_tiles_in_flight=None, max_downscale=8, fallback_executor=None,
+                 deadline_reserve=0.1):
+        workers = os.cpu_count() or 1
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers)
+        self.fallback_executor = fallback_executor or ThreadPoolExecutor(max_workers=1)
+        self.tile_rows = tile_rows
+        self.max_tiles_in_flight = max_tiles_in_flight or 2 * workers
+        self.max_downscale = max_downscale
+        self.deadline_reserve = deadline_reserve
+        self.seconds_per_pixel_iteration = None
+        self.stats = {"requests": 0, "renders": 0, "coalesced": 0, "cancelled": 0, "downscaled": 0,
+                      "overruns": 0}
+        self._in_flight = {}
+
+    def estimate_seconds(self, width, height, max_iterations):
+
+        """
+            Predict how long a render takes from the throughput of the previous renders,
+            or return None before the first render has finished.
+        """
+
+        if self.seconds_per_pixel_iteration is None:
+            return None
+        return width * height * max_iterations * self.seconds_per_pixel_iteration
+
+    def _choose_scale(self, width, height, max_iterations, deadline):
+        scale = 1
+        if deadline is None:
+            return scale
+        while scale < self.max_downscale:
+            estimate = self.estimate_seconds(max(1, width // scale), max(1, height // scale), max_iterations)
+            if estimate is None or estimate <= deadline:
+                break
+            scale *= 2
+        return scale
+
+    async def render(self, width, height, xmin, xmax, ymin, ymax, max_iterations, deadline=None):
+
+        """
+            Render a viewport, sharing the work with identical requests already in flight.
+
+            Parameters:
+                width (int): The width of the image (number of pixels).
+                height (int): The height of the image (number of pixels).
+                xmin (float): The minimum value of the real part of the complex plane.
+                xmax (float): The maximum value of the real part of the complex plane.
+                ymin (float): The minimum value of the imaginary part of the complex plane.
+                ymax (float): The maximum value of the imaginary part of the complex plane.
+                max_iterations (int): The maximum number of iterations to perform.
+                deadline (float): Seconds from now by which the result is wanted, or None.
+
+            Returns:
+                tuple: (image, scale). 'image' is an int32 array of shape (height // scale,
+                    width // scale); 'scale' is 1 unless the deadline forced a lower resolution,
+                    and 'max_downscale' when the deadline was overrun.
+        """
+
+        self.stats["requests"] += 1
+        scale = self._choose_scale(width, height, max_iterations, deadline)
+        view = (xmin, xmax, ymin, ymax, max_iterations)
+        if deadline is None:
+            image = await self._wait(self._claim(width, height, *view))
+        elif scale == self.max_downscale:
+            image = await self._wait(self._claim(width // scale, height // scale, *view, executor=self.fallback_executor))
+        else:
+            # The coarsest render runs alongside on its own executor, so it is ready when the deadline passes
+            fallback = self._claim(width // self.max_downscale, height // self.max_downscale, *view,
+                                   executor=self.fallback_executor)
+            try:
+                image = await self._wait(self._claim(width // scale, height // scale, *view),
+                                         deadline * (1 - self.deadline_reserve))
+            except asyncio.TimeoutError:
+                self.stats["overruns"] += 1
+                scale = self.max_downscale
+                image = await self._wait(fallback)
+            except BaseException:
+                self._release(fallback)
+                raise
+            else:
+                self._release(fallback)
+        if scale > 1:
+            self.stats["downscaled"] += 1
+        return image, scale
+
+    def _claim(self, width, height, xmin, xmax, ymin, ymax, max_iterations, executor=None):
+
+        """
+            Register interest in the render of a viewport, starting it on 'executor' (self.executor
+            when None) unless an identical one is already in flight. Every claim is given up
+            through _wait or _release.
+        """
+
+        key = (max(1, width), max(1, height), xmin, xmax, ymin, ymax, max_iterations)
+        entry = self._in_flight.get(key)
+        if entry is None:
+            entry = [asyncio.ensure_future(self._render(*key, executor or self.executor)), 0]
+            self._in_flight[key] = entry
+            entry[0].add_done_callback(lambda task, key=key, entry=entry: self._forget(key, entry))
+        else:
+            self.stats["coalesced"] += 1
+        entry[1] += 1
+        return key, entry
+
+    def _release(self, claim):
+        key, entry = claim
+        entry[1] -= 1
+        if entry[1] == 0 and not entry[0].done():
+            self._forget(key, entry)
+            entry[0].cancel()
+            self.stats["cancelled"] += 1
+
+    async def _wait(self, claim, timeout=None):
+
+        """
+            Wait up to 'timeout' seconds for a claimed render and give up the claim. A render
+            nobody waits for any more is cancelled.
+        """
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(claim[1][0]), timeout)
+        finally:
+            self._release(claim)
+
+    def _forget(self, key, entry):
+        if self._in_flight.get(key) is entry:
+            del self._in_flight[key]
+
+    async def _render(self, width, height, xmin, xmax, ymin, ymax, max_iterations, executor):
+        loop = asyncio.get_running_loop()
+        real = axis_coordinates(width, xmin, xmax)
+        imag = axis_coordinates(height, ymin, ymax)
+        image = np.empty((height, width), dtype=np.int32)
+        tiles = iter(range(0, height, self.tile_rows))
+        pending = {}
+
+        def submit_next():
+            for r0 in tiles:
+                r1 = min(r0 + self.tile_rows, height)
+                future = loop.run_in_executor(executor, render_rows, real, imag[r0:r1], max_iterations)
+                pending[future] = (r0, r1)
+                return True
+            return False
+
+        start_time = time.perf_counter()
+        try:
+            while len(pending) < self.max_tiles_in_flight and submit_next():
+                pass
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    r0, r1 = pending.pop(future)
+                    image[r0:r1] = future.result()
+                    submit_next()
+        except asyncio.CancelledError:
+            for future in pending:
+                future.cancel()
+            raise
+
+        seconds = time.perf_counter() - start_time
+        observed = seconds / (width * height * max_iterations)
+        if self.seconds_per_pixel_iteration is None:
+            self.seconds_per_pixel_iteration = observed
+        else:
+            self.seconds_per_pixel_iteration = 0.7 * self.seconds_per_pixel_iteration + 0.3 * observed
+        self.stats["renders"] += 1
+        return image
+
+async def load_test(service, views, clients=16, requests_per_client=8, deadline=None, seed=0):
+
+    """
+        Drive the service with concurrent clients and measure throughput and latency.
+
+        Every client sends 'requests_per_client' requests one after the other, each for a view
+        picked at random from 'views', so clients regularly ask for the same frame at the same time.
+
+        Parameters:
+            service (RenderService): The service under test.
+            views (list): (width, height, xmin, xmax, ymin, ymax, max_iterations) tuples.
+            clients (int): The number of concurrent clients.
+            requests_per_client (int): The number of requests each client sends.
+            deadline (float): The deadline of every request, or None.
+            seed (int): The seed of the view choice.
+
+        Returns:
+            dict: 'requests', 'seconds', 'throughput' (requests per second) and the 'p50', 'p95'
+                and 'p99' latencies in seconds, plus the service counters.
+    """
+
+    rng = random.Random(seed)
+    schedule = [[rng.choice(views) for _ in range(requests_per_client)] for _ in range(clients)]
+    latencies = []
+
+    async def client(requests):
+        for view in requests:
+            start_time = time.perf_counter()
+            await service.render(*view, deadline=deadline)
+            latencies.append(time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client(requests) for requests in schedule))
+    seconds = time.perf_counter() - start_time
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return dict(service.stats, requests=len(latencies), seconds=seconds, throughput=len(latencies) / seconds,
+                p50=p50, p95=p95, p99=p99)
+
+def main():
+
+    """
+        Run the load generator against a local service with and without deadlines.
+    """
+
+    views = [(400, 400, -2.0, 1.0, -1.5, 1.5, 200),
+             (400, 400, -0.8, -0.7, 0.05, 0.15, 500),
+             (400, 400, -1.8, -1.7, -0.05, 0.05, 300),
+             (400, 400, -0.2, 0.1, 0.9, 1.2, 400)]
+
+    for deadline in (None, 0.05):
+        service = RenderService()
+        render_rows(np.zeros(1), np.zeros(1), 1)
+        result = asyncio.run(load_test(service, views, deadline=deadline))
+        print(f"deadline {deadline}: {result['requests']} requests in {result['seconds']:.2f} seconds, "
+              f"{result['throughput']:.1f} requests/s, p50 {result['p50'] * 1000:.0f} ms, "
+              f"p95 {result['p95'] * 1000:.0f} ms, p99 {result['p99'] * 1000:.0f} ms, "
+              f"{result['renders']} renders, {result['coalesced']} coalesced, {result['downscaled']} downscaled, "
+              f"{result['overruns']} overruns")
+        service.executor.shutdown()
+        service.fallback_executor.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from render_engines import get_engine
+from render_service import RenderService, load_test, render_rows
+
+VIEW = (-2.0, 1.0, -1.5, 1.5)
+
+def test_identical_requests_are_coalesced():
+    expected, _ = get_engine("numba").compute(64, 48, *VIEW, 100)
+    service = RenderService(tile_rows=8)
+
+    async def run():
+        return await asyncio.gather(*(service.render(64, 48, *VIEW, 100) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert service.stats["renders"] == 1
+    assert service.stats["coalesced"] == 2
+    for image, scale in results:
+        assert scale == 1
+        np.testing.assert_array_equal(image, expected)
+
+def test_disconnect_cancels_remaining_tiles():
+    service = RenderService(tile_rows=1, max_tiles_in_flight=1)
+    # Compile the kernel outside the timed part
+    asyncio.run(service.render(8, 8, *VIEW, 10))
+
+    async def run():
+        request = asyncio.ensure_future(service.render(400, 400, *VIEW, 5000))
+        await asyncio.sleep(0.05)
+        request.cancel()
+        start_time = time.perf_counter()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        await asyncio.sleep(0.05)
+        return time.perf_counter() - start_time
+
+    assert asyncio.run(run()) < 1.0
+    assert service.stats["cancelled"] == 1
+    assert service.stats["renders"] == 1
+    assert not service._in_flight
+
+def test_coalesced_render_survives_one_disconnect():
+    expected, _ = get_engine("numba").compute(64, 64, *VIEW, 200)
+    service = RenderService(tile_rows=4)
+
+    async def run():
+        leaving = asyncio.ensure_future(service.render(64, 64, *VIEW, 200))
+        staying = asyncio.ensure_future(service.render(64, 64, *VIEW, 200))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        return await staying
+
+    image, _ = asyncio.run(run())
+    np.testing.assert_array_equal(image, expected)
+    assert service.stats["cancelled"] == 0
+
+def test_deadline_falls_back_to_lower_resolution():
+    service = RenderService()
+    service.seconds_per_pixel_iteration = 1e-6
+    image, scale = asyncio.run(service.render(80, 64, *VIEW, 100, deadline=0.1))
+    assert scale == 4
+    assert image.shape == (16, 20)
+    assert service.stats["downscaled"] == 1
+
+@pytest.mark.parametrize("seconds_per_pixel_iteration", [None, 1e-15])
+def test_deadline_overrun_serves_coarsest_render(seconds_per_pixel_iteration):
+    service = RenderService(tile_rows=1, max_tiles_in_flight=1)
+    # Compile the kernel outside the timed part
+    render_rows(np.zeros(1), np.zeros(1), 1)
+    service.seconds_per_pixel_iteration = seconds_per_pixel_iteration
+
+    async def run():
+        start_time = time.perf_counter()
+        result = await service.render(400, 400, *VIEW, 5000, deadline=0.05)
+        return result, time.perf_counter() - start_time
+
+    (image, scale), seconds = asyncio.run(run())
+    # The coarse render runs alongside the full one, so it is ready when the deadline passes
+    assert seconds < 0.05 + 0.01
+    assert scale == 8
+    assert image.shape == (50, 50)
+    np.testing.assert_array_equal(image, get_engine("numba").compute(50, 50, *VIEW, 5000)[0])
+    assert service.stats["overruns"] == 1
+    assert service.stats["cancelled"] == 1
+    assert not service._in_flight
+
+def test_load_test_reports_latency_percentiles():
+    service = RenderService()
+    views = [(32, 32, *VIEW, 50), (32, 32, -0.8, -0.7, 0.05, 0.15, 50)]
+    result = asyncio.run(load_test(service, views, clients=4, requests_per_client=3))
+    assert result["requests"] == 12
+    assert result["p50"] <= result["p95"] <= result["p99"]
+    assert result["renders"] + result["coalesced"] == 12
+
+if __name__ == "__main__":
+    pytest.main()
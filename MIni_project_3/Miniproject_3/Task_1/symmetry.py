@@ -0,0 +1,64 @@
+import numpy as np
+
+def mirror_plan(imag):
+
+    """
+        Find the rows of a viewport that are mirror images of other rows about the real axis.
+
+        Because conj(z)^2 + conj(c) = conj(z^2 + c), a point and its conjugate escape after the same
+        number of iterations, and the floating-point operations of the iteration are symmetric
+        in the sign of the imaginary part. Row 'i' may therefore be copied from row 'k' whenever
+        imag[i] == -imag[k] exactly. Only exact matches are used, so a mirrored row is identical
+        to what computing it directly would give.
+
+        Parameters:
+            imag (numpy.ndarray): The imaginary coordinate of every row.
+
+        Returns:
+            tuple: (compute_rows, mirrored_rows, source_rows), three int arrays. Rows in
+                'compute_rows' must be computed; mirrored_rows[k] is then a copy of source_rows[k].
+    """
+
+    index = {value: i for i, value in enumerate(imag.tolist())}
+    mirrored_rows = []
+    source_rows = []
+    for i, value in enumerate(imag.tolist()):
+        if value < 0 and -value in index:
+            mirrored_rows.append(i)
+            source_rows.append(index[-value])
+
+    compute = np.ones(len(imag), dtype=bool)
+    compute[mirrored_rows] = False
+    return np.flatnonzero(compute), np.array(mirrored_rows, dtype=np.intp), np.array(source_rows, dtype=np.intp)
+
+def apply_mirror(image, mirrored_rows, source_rows):
+
+    """
+        Fill the mirrored rows of 'image' from their source rows, in place.
+
+        When the mirrored rows form one block whose sources run backwards, which is the case for
+        any viewport mapped with render_engines.axis_coordinates, this is a single strided copy.
+
+        Parameters:
+            image (numpy.ndarray): An array whose first axis is the row index.
+            mirrored_rows (numpy.ndarray): The rows to fill, as returned by mirror_plan.
+            source_rows (numpy.ndarray): The rows to copy from, as returned by mirror_plan.
+    """
+
+    if len(mirrored_rows) == 0:
+        return
+    if np.all(np.diff(mirrored_rows) == 1) and np.all(np.diff(source_rows) == -1):
+        stop = source_rows[-1] - 1
+        image[mirrored_rows[0]:mirrored_rows[-1] + 1] = image[source_rows[0]:stop if stop >= 0 else None:-1]
+    else:
+        image[mirrored_rows] = image[source_rows]
+
+def contiguous_block(rows):
+
+    """
+        Return (start, stop) if 'rows' is a run of consecutive indices, else None.
+    """
+
+    if len(rows) and rows[-1] - rows[0] == len(rows) - 1:
+        return int(rows[0]), int(rows[-1]) + 1
+    return None
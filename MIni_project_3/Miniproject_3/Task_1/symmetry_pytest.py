@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+import numba_approach
+from multiprocess_approach import compute_mandelbrot_row, generate_mandelbrot_parallel
+from render_engines import axis_coordinates, get_engine, ENGINES
+from symmetry import mirror_plan, apply_mirror
+
+VIEWPORTS = [
+    (-2.0, 1.0, -1.5, 1.5),    # centred on the real axis
+    (-2.0, 1.0, -0.5, 1.5),    # off-centre, straddling the axis
+    (-0.8, -0.6, -0.13, 0.3),  # zoomed, mostly above the axis
+    (-2.0, 1.0, 0.2, 1.2),     # does not straddle the axis
+]
+
+@pytest.mark.parametrize("height", [7, 8, 101])
+def test_mirror_plan_is_exact(height):
+    for _, _, ymin, ymax in VIEWPORTS:
+        imag = axis_coordinates(height, ymin, ymax)
+        compute_rows, mirrored_rows, source_rows = mirror_plan(imag)
+        np.testing.assert_array_equal(imag[mirrored_rows], -imag[source_rows])
+        assert not set(mirrored_rows) & set(compute_rows)
+        assert set(source_rows) <= set(compute_rows)
+        assert len(compute_rows) + len(mirrored_rows) == height
+
+def test_centred_view_saves_half_the_rows():
+    compute_rows, mirrored_rows, _ = mirror_plan(axis_coordinates(1000, -1.5, 1.5))
+    assert len(mirrored_rows) == 500
+
+OFF_CENTRE = [(1000, -0.5, 1.5), (1080, -1.0, 2.0), (1000, -1.2, 0.9), (999, -1.5, 1.5), (12, -0.5, 1.5),
+              (27, -0.13, 0.3)]
+
+@pytest.mark.parametrize("n, lo, hi", OFF_CENTRE + [(40, -2.0, 1.0), (101, 0.2, 1.2)])
+def test_axis_coordinates_keep_the_viewport(n, lo, hi):
+    coordinates = axis_coordinates(n, lo, hi)
+    assert coordinates[0] == lo and coordinates[-1] == hi
+    np.testing.assert_allclose(np.diff(coordinates), (hi - lo) / (n - 1), rtol=1e-9)
+
+@pytest.mark.parametrize("height, ymin, ymax", OFF_CENTRE)
+def test_snapped_off_centre_views_mirror_the_shorter_side(height, ymin, ymax):
+    imag = axis_coordinates(height, ymin, ymax, anchor_zero=True)
+    _, mirrored_rows, _ = mirror_plan(imag)
+    assert len(mirrored_rows) == min(np.count_nonzero(imag < 0), np.count_nonzero(imag > 0)) > 0
+    step = (ymax - ymin) / (height - 1)
+    np.testing.assert_allclose(np.diff(imag), step, rtol=1e-9)
+    assert max(abs(imag[0] - ymin), abs(imag[-1] - ymax)) <= step / 4 * (1 + 1e-9)
+
+def test_snapping_leaves_other_ranges_alone():
+    np.testing.assert_array_equal(axis_coordinates(50, 0.2, 1.2, anchor_zero=True), axis_coordinates(50, 0.2, 1.2))
+
+def test_apply_mirror_fancy_indexing():
+    image = np.arange(12).reshape(6, 2)
+    apply_mirror(image, np.array([0, 3]), np.array([5, 1]))
+    np.testing.assert_array_equal(image[[0, 3]], image[[5, 1]])
+
+@pytest.mark.parametrize("snap_to_axis", [False, True])
+@pytest.mark.parametrize("viewport", VIEWPORTS)
+def test_numba_approach_matches_direct(viewport, snap_to_axis):
+    width, height, max_iterations = 23, 31, 60
+    real = axis_coordinates(width, viewport[0], viewport[1])
+    imag = axis_coordinates(height, viewport[2], viewport[3], anchor_zero=snap_to_axis)
+    direct = numba_approach.compute_mandelbrot_rows(real, imag, max_iterations)
+    np.testing.assert_array_equal(numba_approach.generate_mandelbrot(width, height, *viewport, max_iterations,
+                                                                      snap_to_axis=snap_to_axis), direct)
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("viewport", VIEWPORTS)
+def test_engines_match_direct(engine, viewport):
+    pytest.importorskip({"opencl": "pyopencl", "threads": "numba"}.get(engine, engine))
+    renderer = get_engine(engine)
+    args = (19, 27, *viewport, 60)
+    renderer.snap_to_axis = True
+    try:
+        counts, modulus_sq = renderer.compute(*args)
+        if viewport[2] < 0 < viewport[3]:
+            assert renderer.mirrored_rows > 0
+        renderer.symmetric = False
+        direct_counts, direct_modulus_sq = renderer.compute(*args)
+    finally:
+        renderer.symmetric = True
+        renderer.snap_to_axis = False
+    np.testing.assert_array_equal(counts, direct_counts)
+    np.testing.assert_array_equal(modulus_sq, direct_modulus_sq)
+
+def test_generate_mandelbrot_parallel_matches_direct():
+    # An off-centre view whose exact row coordinates include mirrored pairs: -1.0 .. 2.0 in steps of 0.25
+    width, height, max_iterations = 9, 13, 40
+    viewport = (-2.0, 1.0, -1.0, 2.0)
+    assert len(mirror_plan(axis_coordinates(height, viewport[2], viewport[3]))[1]) == 4
+    direct = [compute_mandelbrot_row((i, width, height, *viewport, max_iterations)) for i in range(height)]
+    np.testing.assert_array_equal(generate_mandelbrot_parallel(width, height, *viewport, max_iterations), direct)
+
+if __name__ == "__main__":
+    pytest.main()
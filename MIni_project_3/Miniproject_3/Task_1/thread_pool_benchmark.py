@@ -0,0 +1,63 @@
+import contextlib
+import io
+import os
+import time
+from multiprocess_approach import generate_mandelbrot_parallel
+from render_engines import get_engine
+
+def time_call(function, repeats=3):
+
+    """
+        Return the best wall time in seconds of 'repeats' calls of 'function'.
+    """
+
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+def benchmark_frame(width, height, xmin, xmax, ymin, ymax, max_iterations, multiprocess=True):
+
+    """
+        Time one frame with the thread-pool engine, the Numba prange engine and the process pool.
+
+        The Numba engines are created (and their kernels compiled) before timing. The process
+        pool is timed as it is used in multiprocess_approach, so every call pays for starting
+        the workers, pickling the arguments and copying the rows back.
+
+        Returns:
+            dict: Seconds per frame for 'threads', 'prange' and, if 'multiprocess' is set, 'processes'.
+    """
+
+    threads = get_engine("threads")
+    prange = get_engine("numba")
+    view = (width, height, xmin, xmax, ymin, ymax, max_iterations)
+    results = {
+        "threads": time_call(lambda: threads.compute(*view)),
+        "prange": time_call(lambda: prange.compute(*view)),
+    }
+    if multiprocess:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["processes"] = time_call(lambda: generate_mandelbrot_parallel(*view), repeats=1)
+    return results
+
+def main():
+
+    """
+        Compare the engines on a small frame, where startup costs dominate, and on large frames.
+    """
+
+    x_min, x_max = -2.0, 1.0
+    y_min, y_max = -1.5, 1.5
+    max_iterations = 100
+    print(f"{os.cpu_count()} cores")
+
+    for size, multiprocess in ((256, True), (1000, True), (4000, False)):
+        results = benchmark_frame(size, size, x_min, x_max, y_min, y_max, max_iterations, multiprocess)
+        line = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in results.items())
+        print(f"{size}x{size}: {line}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import concurrent.futures
+import threading
+import types
+import numpy as np
+import pytest
+from render_engines import ThreadPoolEngine, get_engine
+
+VIEW = (-2.0, 1.0, -1.5, 1.5)
+
+@pytest.mark.parametrize("max_workers, tile_rows", [(1, 8), (4, 3), (3, 1000)])
+def test_thread_pool_matches_prange(max_workers, tile_rows):
+    engine = ThreadPoolEngine(max_workers=max_workers, tile_rows=tile_rows)
+    counts, modulus_sq = engine.compute(123, 97, *VIEW, 150)
+    expected_counts, expected_modulus_sq = get_engine("numba").compute(123, 97, *VIEW, 150)
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_array_equal(modulus_sq, expected_modulus_sq)
+    engine.executor.shutdown()
+
+def test_tiles_are_shared_dynamically():
+    engine = ThreadPoolEngine(max_workers=2, tile_rows=2)
+    kernels = engine._kernels
+    first_tile_taken = threading.Lock()
+    released = threading.Event()
+
+    def slow_first_tile(*args):
+        # The first tile holds its worker until the test releases it
+        if first_tile_taken.acquire(blocking=False):
+            assert released.wait(10)
+        kernels.escape_time_tile(*args)
+
+    engine._kernels = types.SimpleNamespace(escape_time_tile=slow_first_tile)
+    real = np.linspace(-2.0, 1.0, 16)
+    imag = np.linspace(-1.5, 1.5, 40)
+    counts = np.zeros((40, 16), dtype=np.int32)
+    modulus_sq = np.zeros((40, 16), dtype=np.float64)
+    tiles = iter(range(0, 40, 2))
+    done = [engine.executor.submit(engine._work, tiles, real, imag, 50, counts, modulus_sq) for _ in range(2)]
+    # With a static split the free worker would stop after its own half of the tiles
+    finished, _ = concurrent.futures.wait(done, timeout=10, return_when=concurrent.futures.FIRST_COMPLETED)
+    released.set()
+    assert len(finished) == 1
+    assert sorted(worker.result() for worker in done) == [1, 19]
+    assert np.all(counts > 0)
+    engine.executor.shutdown()
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,25 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+__kernel void calculate_julia(__global int *counts, __global const double *real, __global const double *imag, __global const double2 *c_values, const int width, const int height, const int max_iterations) {
+    int i = get_global_id(0);
+    int j = get_global_id(1);
+    int k = get_global_id(2);
+
+    double2 c = c_values[k];
+
+    double x = real[i];
+    double y = imag[j];
+    double x2 = x * x;
+    double y2 = y * y;
+
+    int iteration = 0;
+    while (x2 + y2 <= 4.0 && iteration < max_iterations) {
+        y = 2.0 * x * y + c.y;
+        x = x2 - y2 + c.x;
+        x2 = x * x;
+        y2 = y * y;
+        iteration++;
+    }
+
+    counts[(k * height + j) * width + i] = iteration;
+}
@@ -0,0 +1,56 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+double2 distance_sample(double c_real, double c_imag, int max_iterations, double escape_radius_sq) {
+    double x = 0.0;
+    double y = 0.0;
+    double x2 = 0.0;
+    double y2 = 0.0;
+    double dx = 0.0;
+    double dy = 0.0;
+
+    int iteration = 0;
+    while (x2 + y2 <= escape_radius_sq && iteration < max_iterations) {
+        double new_dx = 2.0 * (x * dx - y * dy) + 1.0;
+        dy = 2.0 * (x * dy + y * dx);
+        dx = new_dx;
+        y = 2.0 * x * y + c_imag;
+        x = x2 - y2 + c_real;
+        x2 = x * x;
+        y2 = y * y;
+        iteration++;
+    }
+
+    if (x2 + y2 <= escape_radius_sq) {
+        return (double2)(0.0, -1.0);
+    }
+
+    double modulus = sqrt(x2 + y2);
+    double log_modulus = log(modulus);
+    double distance = modulus * log_modulus / sqrt(dx * dx + dy * dy);
+    double value = (iteration + 1 - log2(log_modulus)) / max_iterations;
+    return (double2)(clamp(value, 0.0, 1.0), distance);
+}
+
+__kernel void calculate_distance_estimate(__global double *values, __global double *distances, __global const double *real, __global const double *imag, const int width, const int max_iterations, const double escape_radius_sq) {
+    int i = get_global_id(0);
+    int j = get_global_id(1);
+
+    double2 sample = distance_sample(real[i], imag[j], max_iterations, escape_radius_sq);
+    values[j * width + i] = sample.x;
+    distances[j * width + i] = sample.y;
+}
+
+__kernel void supersample_pixels(__global double *values, __global const int *rows, __global const int *cols, __global const int *sides, __global const double *real, __global const double *imag, const double pixel_dx, const double pixel_dy, const int width, const int max_iterations, const double escape_radius_sq) {
+    int k = get_global_id(0);
+    int side = sides[k];
+
+    double total = 0.0;
+    for (int a = 0; a < side; a++) {
+        double c_imag = imag[rows[k]] + ((a + 0.5) / side - 0.5) * pixel_dy;
+        for (int b = 0; b < side; b++) {
+            double c_real = real[cols[k]] + ((b + 0.5) / side - 0.5) * pixel_dx;
+            total += distance_sample(c_real, c_imag, max_iterations, escape_radius_sq).x;
+        }
+    }
+    values[rows[k] * width + cols[k]] = total / (side * side);
+}
@@ -1,4 +1,4 @@
-__kernel void calculate_mandelbrot(__global float *result, const int width, const int height, const float xmin, const float xmax, const float ymin, const float ymax, const int max_iterations) {
+__kernel void calculate_mandelbrot(__global int *result, const int width, const int height, const float xmin, const float xmax, const float ymin, const float ymax, const int max_iterations) {
     int i = get_global_id(0);
     int j = get_global_id(1);
     
@@ -1,11 +1,14 @@
+import os
 import numpy as np
 import pyopencl as cl
 import time
 
+KERNEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mandelbrot_opencl.cl")
+
 def mandelbrot_opencl(width, height, xmin, xmax, ymin, ymax, max_iterations):
     try:
         # Load the OpenCL kernel code from a file
-        with open("mandelbrot_opencl.cl", "r") as f:
+        with open(KERNEL_PATH, "r") as f:
             kernel_code = f.read()
 
         # Get all available platforms
@@ -74,14 +77,18 @@ def mandelbrot_opencl(width, height, xmin, xmax, ymin, ymax, max_iterations):
         print(f"An error occurred during setup or execution: {e}")
         return []
 
-# Benchmarking different grid sizes
-widths = [500, 1000, 1500]
-x_min, x_max = -2.0, 1.0
-y_min, y_max = -1.5, 1.5
-max_iterations = 100
-
-for width in widths:
-    print(f"Benchmarking results for width={width}:")
-    results = mandelbrot_opencl(width, width, x_min, x_max, y_min, y_max, max_iterations)
-    for device_name, execution_time in results:
-        print(f"Device: {device_name}, Execution Time: {execution_time} seconds")
\ No newline at end of file
+def main():
+    # Benchmarking different grid sizes
+    widths = [500, 1000, 1500]
+    x_min, x_max = -2.0, 1.0
+    y_min, y_max = -1.5, 1.5
+    max_iterations = 100
+
+    for width in widths:
+        print(f"Benchmarking results for width={width}:")
+        results = mandelbrot_opencl(width, width, x_min, x_max, y_min, y_max, max_iterations)
+        for device_name, execution_time in results:
+            print(f"Device: {device_name}, Execution Time: {execution_time} seconds")
+
+if __name__ == "__main__":
+    main()
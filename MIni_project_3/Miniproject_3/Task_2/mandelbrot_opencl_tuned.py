@@ -0,0 +1,215 @@
+import json
+import os
+import sys
+import time
+import numpy as np
+import pyopencl as cl
+
+KERNEL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+VECTOR_WIDTHS = (4, 8)
+
+# Frame used to time the candidate settings: (width, height, xmin, xmax, ymin, ymax, max_iterations)
+TUNING_FRAME = (512, 512, -2.0, 1.0, -1.5, 1.5, 256)
+
+_tuning_cache = {}
+
+def device_key(device):
+
+    """
+        Identify a device across runs by its platform, name and driver version.
+    """
+
+    return f"{device.platform.name}/{device.name}/{device.driver_version}"
+
+def _round_up(value, multiple):
+    return -(-value // multiple) * multiple
+
+class TunedMandelbrot:
+
+    """
+        Runs the vectorized kernel of mandelbrot_opencl_vector.cl with a work-group size and vector
+        width tuned for the device, next to the scalar calculate_mandelbrot of mandelbrot_opencl.cl,
+        which is kept as the reference.
+
+        The first time a device is used in a process, every vector width and 2-D work-group size
+        is timed on TUNING_FRAME and the fastest is kept for the other renderers. Give a
+        'cache_path' to also store it in a JSON file, so later runs on the same device and driver
+        skip the tuning.
+
+        Parameters:
+            device_type (str): "CPU" or "GPU".
+            precision (str): "float" for float4/float8 or "double" for double4/double8.
+            cache_path (str): The JSON file of tuned settings, None (the default) to keep them in memory only.
+    """
+
+    def __init__(self, device_type="CPU", precision="float", cache_path=None):
+        if precision not in ("float", "double"):
+            raise ValueError(f"Unknown precision '{precision}', expected 'float' or 'double'")
+        devices = []
+        for platform in cl.get_platforms():
+            try:
+                devices.extend(platform.get_devices(device_type=getattr(cl.device_type, device_type)))
+            except cl.LogicError:
+                continue
+        if not devices:
+            raise ValueError(f"No OpenCL {device_type} device found.")
+
+        self.device = devices[0]
+        self.context = cl.Context([self.device])
+        self.queue = cl.CommandQueue(self.context)
+        self.precision = precision
+        self.real_type = np.float32 if precision == "float" else np.float64
+        self.cache_path = cache_path
+        self._kernels = {}
+        with open(os.path.join(KERNEL_DIR, "mandelbrot_opencl.cl"), "r") as f:
+            self._reference = cl.Kernel(cl.Program(self.context, f.read()).build(), "calculate_mandelbrot")
+        self.settings = self._load_or_tune()
+
+    def _kernel(self, vector_width):
+        if vector_width not in self._kernels:
+            options = [f"-DWIDTH={vector_width}"] + (["-DUSE_DOUBLE"] if self.precision == "double" else [])
+            with open(os.path.join(KERNEL_DIR, "mandelbrot_opencl_vector.cl"), "r") as f:
+                program = cl.Program(self.context, f.read()).build(options=options)
+            self._kernels[vector_width] = cl.Kernel(program, "calculate_mandelbrot_vector")
+        return self._kernels[vector_width]
+
+    def candidate_local_sizes(self, vector_width):
+
+        """
+            Return the 2-D work-group sizes to try: powers of two with 4 to 256 work items that
+            the device and the compiled kernel accept.
+        """
+
+        kernel = self._kernel(vector_width)
+        limit = min(256, kernel.get_work_group_info(cl.kernel_work_group_info.WORK_GROUP_SIZE, self.device))
+        max_x, max_y = self.device.max_work_item_sizes[:2]
+        powers = [2**k for k in range(9)]
+        return [(lx, ly) for lx in powers for ly in powers if 4 <= lx * ly <= limit and lx <= max_x and ly <= max_y]
+
+    def _launch(self, vector_width, local_size, width, height, xmin, xmax, ymin, ymax, max_iterations):
+        kernel = self._kernel(vector_width)
+        padded_width = _round_up(width, vector_width)
+        lx, ly = local_size
+        global_size = (_round_up(padded_width // vector_width, lx), _round_up(height, ly))
+        output_buf = cl.Buffer(self.context, cl.mem_flags.WRITE_ONLY, padded_width * height * np.dtype(np.int32).itemsize)
+
+        start_time = time.perf_counter()
+        kernel(self.queue, global_size, tuple(local_size), output_buf, np.int32(padded_width), np.int32(height),
+               self.real_type(xmin), self.real_type((xmax - xmin) / width),
+               self.real_type(ymin), self.real_type((ymax - ymin) / height), np.int32(max_iterations))
+        self.queue.finish()
+        seconds = time.perf_counter() - start_time
+
+        output = np.empty((height, padded_width), dtype=np.int32)
+        cl.enqueue_copy(self.queue, output, output_buf)
+        return output[:, :width], seconds
+
+    def tune(self, repeats=2):
+
+        """
+            Time every vector width and work-group size on TUNING_FRAME and return the fastest.
+
+            Returns:
+                dict: 'vector_width', 'local_size' and the 'pixels_per_second' reached while tuning.
+        """
+
+        width, height = TUNING_FRAME[:2]
+        best = None
+        for vector_width in VECTOR_WIDTHS:
+            for local_size in self.candidate_local_sizes(vector_width):
+                seconds = min(self._launch(vector_width, local_size, *TUNING_FRAME)[1] for _ in range(repeats))
+                if best is None or seconds < best[0]:
+                    best = (seconds, vector_width, local_size)
+        seconds, vector_width, local_size = best
+        return {"vector_width": vector_width, "local_size": list(local_size),
+                "pixels_per_second": width * height / seconds}
+
+    def _load_or_tune(self):
+        key = (device_key(self.device), self.precision)
+        if key in _tuning_cache:
+            return _tuning_cache[key]
+
+        stored = {}
+        if self.cache_path and os.path.exists(self.cache_path):
+            with open(self.cache_path, "r") as f:
+                stored = json.load(f)
+        settings = stored.get(key[0], {}).get(self.precision)
+        if settings is None:
+            settings = self.tune()
+            stored.setdefault(key[0], {})[self.precision] = settings
+            if self.cache_path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+                with open(self.cache_path, "w") as f:
+                    json.dump(stored, f, indent=2)
+        _tuning_cache[key] = settings
+        return settings
+
+    def render(self, width, height, xmin, xmax, ymin, ymax, max_iterations):
+
+        """
+            Compute the iteration counts with the tuned vectorized kernel.
+
+            Pixel coordinates are xmin + i * dx here, while render_reference interpolates every
+            pixel in float, so pixels that take many iterations to escape can get other counts:
+            under 1% of the pixels of the full set and up to about 2% of a zoom onto the boundary.
+            Pixels that escape within 10 iterations always match.
+
+            Returns:
+                tuple: (counts, seconds), an int32 array of shape (height, width) and the kernel time.
+        """
+
+        return self._launch(self.settings["vector_width"], self.settings["local_size"],
+                            width, height, xmin, xmax, ymin, ymax, max_iterations)
+
+    def render_reference(self, width, height, xmin, xmax, ymin, ymax, max_iterations):
+
+        """
+            Compute the iteration counts with the scalar reference kernel, launched with local_size=None.
+
+            Returns:
+                tuple: (counts, seconds), an int32 array of shape (height, width) and the kernel time.
+        """
+
+        output_buf = cl.Buffer(self.context, cl.mem_flags.WRITE_ONLY, width * height * np.dtype(np.int32).itemsize)
+        start_time = time.perf_counter()
+        self._reference(self.queue, (width, height), None, output_buf, np.int32(width), np.int32(height),
+                        np.float32(xmin), np.float32(xmax), np.float32(ymin), np.float32(ymax), np.int32(max_iterations))
+        self.queue.finish()
+        seconds = time.perf_counter() - start_time
+        output = np.empty((height, width), dtype=np.int32)
+        cl.enqueue_copy(self.queue, output, output_buf)
+        return output, seconds
+
+def main(cache_path=None):
+
+    """
+        Report pixels per second of the scalar reference and of the tuned float and double kernels
+        on the local CPU OpenCL device.
+
+        Parameters:
+            cache_path (str): The JSON file to keep the tuned settings in between runs, if any.
+    """
+
+    x_min, x_max = -2.0, 1.0
+    y_min, y_max = -1.5, 1.5
+    renderers = {precision: TunedMandelbrot("CPU", precision, cache_path) for precision in ("float", "double")}
+    print(f"Device: {renderers['float'].device.name}")
+    for precision, renderer in renderers.items():
+        print(f"Tuned {precision}: {renderer.settings}")
+
+    for size, max_iterations in ((1000, 100), (2000, 100), (2000, 1000)):
+        frame = (size, size, x_min, x_max, y_min, y_max, max_iterations)
+        reference, _ = renderers["float"].render_reference(*frame)
+        reference_seconds = min(renderers["float"].render_reference(*frame)[1] for _ in range(3))
+        line = f"{size}x{size}, {max_iterations} iterations: scalar {size * size / reference_seconds / 1e6:.1f} Mpixels/s"
+        for precision, renderer in renderers.items():
+            counts, _ = renderer.render(*frame)
+            seconds = min(renderer.render(*frame)[1] for _ in range(3))
+            mismatch = np.count_nonzero(counts != reference) / counts.size
+            line += (f", {precision}{renderer.settings['vector_width']} {size * size / seconds / 1e6:.1f} Mpixels/s "
+                     f"({reference_seconds / seconds:.2f}x, {mismatch:.3%} pixels differ)")
+        print(line)
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
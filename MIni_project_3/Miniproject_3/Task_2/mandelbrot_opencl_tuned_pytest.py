@@ -0,0 +1,72 @@
+import json
+import numpy as np
+import pytest
+
+pytest.importorskip("pyopencl")
+import mandelbrot_opencl_tuned
+from mandelbrot_opencl_tuned import TunedMandelbrot, device_key
+
+VIEW = (-2.0, 1.0, -1.5, 1.5)
+
+@pytest.fixture(autouse=True)
+def tiny_tuning_frame(monkeypatch):
+    monkeypatch.setattr(mandelbrot_opencl_tuned, "TUNING_FRAME", (24, 16, *VIEW, 20))
+    monkeypatch.setattr(mandelbrot_opencl_tuned, "_tuning_cache", {})
+
+def make_renderer(precision="float", cache_path=None):
+    try:
+        return TunedMandelbrot("CPU", precision, cache_path=cache_path)
+    except ValueError:
+        pytest.skip("no OpenCL CPU device")
+
+@pytest.mark.parametrize("precision", ["float", "double"])
+@pytest.mark.parametrize("vector_width", [4, 8])
+@pytest.mark.parametrize("width, height, max_iterations", [(13, 7, 50), (37, 29, 100), (101, 67, 200)])
+def test_render_crops_padding_and_matches_reference(precision, vector_width, width, height, max_iterations):
+    renderer = make_renderer(precision)
+    renderer.settings = {"vector_width": vector_width, "local_size": [4, 2]}
+    counts, seconds = renderer.render(width, height, *VIEW, max_iterations)
+    reference, _ = renderer.render_reference(width, height, *VIEW, max_iterations)
+    assert counts.shape == (height, width) and counts.dtype == np.int32
+    assert seconds > 0
+    differ = counts != reference
+    assert np.count_nonzero(differ) <= 0.01 * counts.size
+    assert np.all(np.minimum(counts, reference)[differ] >= 10)
+
+def test_candidate_local_sizes_fit_the_device():
+    renderer = make_renderer()
+    max_x, max_y = renderer.device.max_work_item_sizes[:2]
+    for vector_width in mandelbrot_opencl_tuned.VECTOR_WIDTHS:
+        candidates = renderer.candidate_local_sizes(vector_width)
+        assert candidates
+        for lx, ly in candidates:
+            assert 4 <= lx * ly <= 256 and lx <= max_x and ly <= max_y
+            assert lx & (lx - 1) == 0 and ly & (ly - 1) == 0
+
+def test_tuned_settings_are_a_candidate():
+    renderer = make_renderer()
+    settings = renderer.settings
+    assert settings["vector_width"] in mandelbrot_opencl_tuned.VECTOR_WIDTHS
+    assert tuple(settings["local_size"]) in renderer.candidate_local_sizes(settings["vector_width"])
+    assert settings["pixels_per_second"] > 0
+
+def test_tuning_is_cached_in_the_json_file(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "tuning.json")
+    first = make_renderer(cache_path=cache_path)
+    with open(cache_path) as f:
+        stored = json.load(f)
+    assert stored[device_key(first.device)]["float"] == first.settings
+
+    def fail(self, repeats=2):
+        raise AssertionError("tuned again instead of reading the cache")
+
+    monkeypatch.setattr(mandelbrot_opencl_tuned, "_tuning_cache", {})
+    monkeypatch.setattr(TunedMandelbrot, "tune", fail)
+    assert make_renderer(cache_path=cache_path).settings == first.settings
+
+def test_unknown_precision():
+    with pytest.raises(ValueError):
+        TunedMandelbrot("CPU", "half")
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,74 @@
+// Vectorized variant of calculate_mandelbrot in mandelbrot_opencl.cl.
+// Build with -DWIDTH=<4|8> for the number of pixels per work item, and -DUSE_DOUBLE for
+// double4/double8 instead of float4/float8. Every work item computes WIDTH consecutive pixels
+// of one row; lanes that have escaped are masked out until every lane is done.
+
+#ifdef USE_DOUBLE
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+typedef double real_t;
+#if WIDTH == 8
+typedef double8 real_v;
+typedef long8 mask_v;
+#define convert_real_v convert_double8
+#else
+typedef double4 real_v;
+typedef long4 mask_v;
+#define convert_real_v convert_double4
+#endif
+#else
+typedef float real_t;
+#if WIDTH == 8
+typedef float8 real_v;
+typedef int8 mask_v;
+#define convert_real_v convert_float8
+#else
+typedef float4 real_v;
+typedef int4 mask_v;
+#define convert_real_v convert_float4
+#endif
+#endif
+
+#if WIDTH == 8
+typedef int8 int_v;
+#define convert_int_v convert_int8
+#define vstore_int vstore8
+#define LANES (int8)(0, 1, 2, 3, 4, 5, 6, 7)
+#else
+typedef int4 int_v;
+#define convert_int_v convert_int4
+#define vstore_int vstore4
+#define LANES (int4)(0, 1, 2, 3)
+#endif
+
+// 'dx' and 'dy' are the pixel sizes, computed once on the host instead of for every pixel.
+// The result rows are padded to a multiple of WIDTH so every work item stores one full vector.
+__kernel void calculate_mandelbrot_vector(__global int *result, const int padded_width, const int height, const real_t xmin, const real_t dx, const real_t ymin, const real_t dy, const int max_iterations) {
+    int column = get_global_id(0) * WIDTH;
+    int j = get_global_id(1);
+    if (column >= padded_width || j >= height) {
+        return;
+    }
+
+    real_v x_coord = xmin + convert_real_v(column + LANES) * dx;
+    real_v y_coord = (real_v)(ymin + j * dy);
+
+    real_v x = (real_v)(0.0);
+    real_v y = (real_v)(0.0);
+    int_v iterations = (int_v)(0);
+    mask_v active = (mask_v)(-1);
+
+    for (int n = 0; n < max_iterations; n++) {
+        real_v x2 = x * x;
+        real_v y2 = y * y;
+        active &= isless(x2 + y2, (real_v)(4.0));
+        if (!any(active)) {
+            break;
+        }
+        // Comparisons give -1 in the lanes where they hold
+        iterations -= convert_int_v(active);
+        y = 2 * x * y + y_coord;
+        x = x2 - y2 + x_coord;
+    }
+
+    vstore_int(iterations, 0, result + j * padded_width + column);
+}
@@ -0,0 +1,26 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+
+__kernel void calculate_mandelbrot_smooth(__global int *counts, __global double *modulus_sq, __global const double *real, __global const double *imag, const int width, const int max_iterations) {
+    int i = get_global_id(0);
+    int j = get_global_id(1);
+
+    double c_real = real[i];
+    double c_imag = imag[j];
+
+    double x = 0.0;
+    double y = 0.0;
+    double x2 = 0.0;
+    double y2 = 0.0;
+
+    int iteration = 0;
+    while (x2 + y2 <= 4.0 && iteration < max_iterations) {
+        y = 2.0 * x * y + c_imag;
+        x = x2 - y2 + c_real;
+        x2 = x * x;
+        y2 = y * y;
+        iteration++;
+    }
+
+    counts[j * width + i] = iteration;
+    modulus_sq[j * width + i] = x2 + y2;
+}
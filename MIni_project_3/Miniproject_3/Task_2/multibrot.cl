@@ -0,0 +1,41 @@
+#pragma OPENCL EXTENSION cl_khr_fp64 : enable
+#pragma OPENCL FP_CONTRACT OFF
+
+// Build with -DEXPONENT=<2..8> -DESCAPE_RADIUS_SQ=<double> -DVARIANT=<0|1|2>
+// (0: standard, 1: burning ship, 2: tricorn). Every combination is a separate program,
+// so the compiler sees constants and unrolls the power and removes the unused variants.
+// Contraction into fused multiply-adds is off so results match the Numba kernels bit for bit.
+
+__kernel void calculate_multibrot(__global int *counts, __global double *modulus_sq, __global const double *real, __global const double *imag, const int width, const int max_iterations) {
+    int i = get_global_id(0);
+    int j = get_global_id(1);
+
+    double c_real = real[i];
+    double c_imag = imag[j];
+
+    double x = 0.0;
+    double y = 0.0;
+
+    int iteration = 0;
+    while (x * x + y * y <= ESCAPE_RADIUS_SQ && iteration < max_iterations) {
+#if VARIANT == 1
+        x = fabs(x);
+        y = fabs(y);
+#elif VARIANT == 2
+        y = -y;
+#endif
+        double zr = x;
+        double zi = y;
+        for (int k = 1; k < EXPONENT; k++) {
+            double t = zr * x - zi * y;
+            zi = zr * y + zi * x;
+            zr = t;
+        }
+        x = zr + c_real;
+        y = zi + c_imag;
+        iteration++;
+    }
+
+    counts[j * width + i] = iteration;
+    modulus_sq[j * width + i] = x * x + y * y;
+}
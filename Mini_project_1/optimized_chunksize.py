@@ -1,12 +1,11 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import time
 from multiprocessing import Pool, cpu_count
 
 def mandelbrot(c, max_iterations):
     z = 0
     for n in range(max_iterations):
-        if abs(z) > 2:
+        if z.real * z.real + z.imag * z.imag > 4:
             return n
         z = z*z + c
     return max_iterations
@@ -32,6 +31,8 @@ def generate_mandelbrot_parallel(args):
     return mandelbrot_set
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     width, height = 1000, 1000
     x_min, x_max = -2.0, 1.0
     y_min, y_max = -1.5, 1.5